@@ -0,0 +1,708 @@
+#!/usr/bin/env python3
+"""
+bench_collect.py — End-to-end benchmarks for collect-skills.py, fully offline.
+
+Each source runs in its own scratch copy of the repo against local stand-ins:
+
+  local   synthetic doc folders (markdown + PDFs) that need AI generation,
+          answered by a fake `claude` CLI or a fake `anthropic` SDK
+          (benchmarks/fakes/, Message Batches included) with configurable
+          latency, plus folders that already ship a SKILL.md
+  github  a fake GitHub REST + raw server with N repos of M skills each
+          (--github-backend graphql adds a fake /graphql endpoint;
+          --github-backend git serves the repos as local bare repos)
+  urls    a skills.txt pointing at K skills served by the same fake server
+
+Every source runs twice: cold (empty skills dir and cache) and warm (a re-run
+with nothing changed).  Each run reports wall time, HTTP requests (and how
+many were 304s), bytes down/up, model calls, skills on disk and the
+collector's peak RSS.  The pair is repeated --repeat times in fresh scratch
+copies, and the median wall time and RSS are reported.  The numbers are
+compared with benchmarks/baseline.json when it was recorded with the same
+settings.  A regression makes the exit status 1:
+
+  - more requests or model calls, or a different number of skills;
+  - more than 5% more bytes;
+  - wall time (beyond a 0.1 s allowance for timer noise) or peak RSS growing
+    by more than --tolerance.
+
+Wall time and RSS depend on the machine, so record a baseline on the machine
+you compare on.
+
+Usage:
+  python benchmarks/bench_collect.py                      # all sources
+  python benchmarks/bench_collect.py --source github --repos 200 --skills 8
+  python benchmarks/bench_collect.py --model sdk --model-latency 0.5
+  python benchmarks/bench_collect.py --source local --model sdk --batch
+  python benchmarks/bench_collect.py --source github --github-backend git
+  python benchmarks/bench_collect.py --update-baseline    # after an intended change
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = Path(__file__).resolve().parent
+COLLECTOR = BENCH_DIR.parent / "collect-skills.py"
+FAKES_DIR = BENCH_DIR / "fakes"
+BASELINE  = BENCH_DIR / "baseline.json"
+OWNER     = "bench"
+
+SOURCES = ("local", "github", "urls")
+# metric -> (column header, format)
+METRICS = {
+    "wall_s":       ("wall s", "{:.2f}"),
+    "requests":     ("reqs", "{:d}"),
+    "not_modified": ("304", "{:d}"),
+    "bytes_down":   ("KB down", "{:.1f}"),
+    "bytes_up":     ("KB up", "{:.1f}"),
+    "model_calls":  ("model", "{:d}"),
+    "skills":       ("skills", "{:d}"),
+    "peak_rss_mb":  ("RSS MB", "{:.1f}"),
+}
+_STRICT_METRICS = ("requests", "model_calls")   # any increase is a regression
+_BYTES_TOLERANCE = 0.05                         # Host headers vary with the port
+_WALL_SLACK_S = 0.1                             # timer noise on sub-second runs
+
+
+# ── synthetic content ──────────────────────────────────────────────────────────
+
+_WORDS = (
+    "client request response config token retry cache index bucket stream "
+    "session handler schema record deploy cluster region policy quota batch "
+    "paginate object upload download timeout endpoint credential profile"
+).split()
+
+
+def _prose(rnd: random.Random, words: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _markdown_doc(rnd: random.Random, title: str, kb: float) -> str:
+    """Reference-style markdown of about kb kilobytes: headings, prose, code."""
+    parts = [f"# {title}\n"]
+    n = 0
+    while sum(map(len, parts)) < kb * 1024:
+        n += 1
+        parts.append(f"\n## Section {n}\n\n{_prose(rnd, 60)}\n\n{_prose(rnd, 40)}\n")
+        if n % 3 == 0:
+            parts.append(f"\n```python\nclient.{rnd.choice(_WORDS)}(timeout={n})\n```\n")
+    return "".join(parts)
+
+
+def _pdf_bytes(lines: list[str]) -> bytes:
+    """A minimal valid one-page PDF that shows lines of text."""
+    def esc(s: str) -> str:
+        return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    stream = "BT /F1 9 Tf 40 800 Td 11 TL\n" + "".join(f"({esc(l)}) '\n" for l in lines) + "ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode()
+    return out
+
+
+def _skill_md(name: str, rnd: random.Random, words: int = 200) -> str:
+    body = "\n\n".join(_prose(rnd, 50) for _ in range(max(1, words // 50)))
+    return (
+        f"---\nname: {name}\n"
+        f"description: Use this skill whenever the user works with {name}, including "
+        f"setup, configuration, the common commands and troubleshooting errors.\n---\n\n"
+        f"## Quick Start\n\n{body}\n\n```bash\n{name} --help\n```\n"
+    )
+
+
+def _make_local_folders(repo: Path, args: argparse.Namespace) -> None:
+    rnd = random.Random(1)
+    for i in range(args.folders):
+        folder = repo / f"lib{i:03d}"
+        folder.mkdir()
+        for d in range(args.docs):
+            (folder / f"guide-{d}.md").write_text(
+                _markdown_doc(rnd, f"lib{i:03d} guide {d}", args.doc_kb), encoding="utf-8")
+        for p in range(args.pdfs):
+            lines = [_prose(rnd, 12) for _ in range(max(1, int(args.pdf_kb * 1024 / 80)))]
+            (folder / f"manual-{p}.pdf").write_bytes(_pdf_bytes(lines))
+    for i in range(args.ready_folders):
+        folder = repo / f"ready{i:03d}"
+        folder.mkdir()
+        (folder / "SKILL.md").write_text(_skill_md(f"ready{i:03d}", rnd), encoding="utf-8")
+
+
+def _make_repos(args: argparse.Namespace) -> dict[str, dict]:
+    """name -> {"pushed_at", "files": {path: text}} for the fake GitHub."""
+    rnd = random.Random(2)
+    now = datetime.now(timezone.utc)
+    repos: dict[str, dict] = {}
+    for i in range(args.repos + args.idle_repos):
+        name = f"repo{i:03d}"
+        files = {f".claude/skills/{name}.md": _skill_md(name, rnd)}
+        for k in range(1, args.skills):
+            topic = f"{name}-topic{k}"
+            files[f".claude/skills/{topic}.md"] = _skill_md(topic, rnd)
+        files[f"tools/{name}-cli/SKILL.md"] = _skill_md(f"{name}-cli", rnd)
+        for f in range(args.tree_files):
+            files[f"src/pkg{f % 10}/module{f}.py"] = f"# module {f}\n"
+        files["README.md"] = f"# {name}\n\n{_prose(rnd, 40)}\n"
+        idle = i >= args.repos
+        pushed = now - timedelta(days=400 if idle else 1, minutes=i)
+        repos[name] = {"pushed_at": pushed.strftime("%Y-%m-%dT%H:%M:%SZ"), "files": files}
+    return repos
+
+
+def _make_url_skills(args: argparse.Namespace) -> dict[str, str]:
+    rnd = random.Random(3)
+    return {f"link{k:03d}": _skill_md(f"link{k:03d}", rnd) for k in range(args.urls)}
+
+
+# ── fake GitHub (REST + raw) ───────────────────────────────────────────────────
+
+def _blob_sha(text: str) -> str:
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _graphql_entries(files: dict[str, str], prefix: str, depth: int) -> list[dict]:
+    """GraphQL tree entries under prefix; subtrees are expanded depth - 1 more levels."""
+    children: dict[str, Optional[str]] = {}   # name -> text (None for a subtree)
+    for path, text in files.items():
+        if path.startswith(prefix):
+            name, sep, _ = path[len(prefix):].partition("/")
+            children[name] = None if sep else text
+    entries = []
+    for name, text in sorted(children.items()):
+        if text is not None:
+            entries.append({"name": name, "type": "blob", "oid": _blob_sha(text)})
+            continue
+        sub = prefix + name + "/"
+        listing = "\n".join(p for p in sorted(files) if p.startswith(sub))
+        entry = {"name": name, "type": "tree", "oid": hashlib.sha1(listing.encode()).hexdigest()}
+        if depth > 1:
+            entry["object"] = {"entries": _graphql_entries(files, sub, depth - 1)}
+        entries.append(entry)
+    return entries
+
+
+class _Counting:
+    """File wrapper that adds every byte read or written to a counter."""
+
+    def __init__(self, raw, server: "_FakeGitHub", key: str) -> None:
+        self._raw, self._server, self._key = raw, server, key
+
+    def _count(self, data):
+        self._server.count(self._key, len(data))
+        return data
+
+    def read(self, *a):
+        return self._count(self._raw.read(*a))
+
+    def readline(self, *a):
+        return self._count(self._raw.readline(*a))
+
+    def write(self, data):
+        self._server.count(self._key, len(data))
+        return self._raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class _FakeGitHub:
+    """
+    Threaded HTTP stand-in for api.github.com and raw.githubusercontent.com:
+
+      GET  /api/users/<owner>/repos?per_page&page&sort=pushed
+      GET  /api/repos/<owner>/<repo>/git/trees/<branch>?recursive=1
+      GET  /raw/<owner>/<repo>/<branch>/<path>
+      POST /graphql   the two query shapes --github-backend graphql sends
+
+    GET responses carry ETags and honor If-None-Match, like GitHub.
+    """
+
+    def __init__(self, repos: dict[str, dict], url_skills: dict[str, str], latency: float) -> None:
+        self.repos = repos
+        self.url_skills = url_skills
+        self.latency = latency
+        self.clone_base: Optional[str] = None   # file:// URL of the bare repos, if made
+        self._lock = threading.Lock()
+        self.reset()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self) -> None:
+                super().setup()
+                self.rfile = _Counting(self.rfile, server, "bytes_up")
+                self.wfile = _Counting(self.wfile, server, "bytes_down")
+
+            def log_message(self, *a) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                server.count("requests", 1)
+                if server.latency:
+                    time.sleep(server.latency)
+                code, body, ctype = server.route(self.path)
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                if code == 200 and self.headers.get("If-None-Match") == etag:
+                    server.count("not_modified", 1)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                if code == 200:
+                    self.send_header("ETag", etag)
+                if self.path.startswith("/api/"):
+                    self.send_header("X-RateLimit-Limit", "5000")
+                    self.send_header("X-RateLimit-Remaining", "4000")
+                    self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                server.count("requests", 1)
+                if server.latency:
+                    time.sleep(server.latency)
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if self.path == "/graphql":
+                    code, body = 200, json.dumps(server.graphql(request["query"])).encode()
+                else:
+                    code, body = 404, b'{"message": "Not Found"}'
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-RateLimit-Limit", "5000")
+                self.send_header("X-RateLimit-Remaining", "4000")
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+                self.end_headers()
+                self.wfile.write(body)
+
+        class Server(ThreadingHTTPServer):
+            # The default listen backlog of 5 is below the collector's -j 8:
+            # dropped SYNs are retried after ~1 s and skew the wall times.
+            request_queue_size = 128
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats = {"requests": 0, "not_modified": 0, "bytes_down": 0, "bytes_up": 0}
+
+    def count(self, key: str, n: int) -> None:
+        with self._lock:
+            self.stats[key] += n
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def route(self, path: str) -> tuple[int, bytes, str]:
+        url = urlparse(path)
+        parts = url.path.strip("/").split("/")
+        if parts[:2] == ["api", "users"] and parts[3:] == ["repos"]:
+            q = parse_qs(url.query)
+            page = int(q.get("page", ["1"])[0])
+            per_page = int(q.get("per_page", ["30"])[0])
+            listing = sorted(
+                ({"name": n, "default_branch": "main", "pushed_at": r["pushed_at"]}
+                 for n, r in self.repos.items()),
+                key=lambda r: r["pushed_at"], reverse=True,
+            )
+            return 200, json.dumps(listing[(page - 1) * per_page:page * per_page]).encode(), "application/json"
+        if parts[:2] == ["api", "repos"] and parts[4:6] == ["git", "trees"]:
+            repo = self.repos.get(parts[3])
+            if repo is None:
+                return 404, b'{"message": "Not Found"}', "application/json"
+            tree = [{"path": p, "type": "blob", "sha": _blob_sha(t)} for p, t in repo["files"].items()]
+            sha = hashlib.sha1(json.dumps(tree).encode()).hexdigest()
+            return 200, json.dumps({"sha": sha, "tree": tree, "truncated": False}).encode(), "application/json"
+        if parts[0] == "raw" and len(parts) >= 5:
+            repo_name, path = parts[2], "/".join(parts[4:])
+            if repo_name == "links":
+                text = self.url_skills.get(path.removesuffix("/SKILL.md"))
+            else:
+                text = self.repos.get(repo_name, {}).get("files", {}).get(path)
+            if text is not None:
+                return 200, text.encode("utf-8"), "text/plain; charset=utf-8"
+        return 404, b"404: Not Found", "text/plain"
+
+    def graphql(self, query: str) -> dict:
+        """
+        Answer the collector's GraphQL queries: per `rN: repository(…)` alias,
+        the default-branch tree nested as deep as the query asks plus the
+        .claude/skills/ texts, and/or `bN: object(oid: …)` blob texts.
+        """
+        data: dict[str, Optional[dict]] = {}
+        aliases = list(re.finditer(r'(r\d+): repository\(owner: "[^"]*", name: "([^"]*)"\) \{', query))
+        for i, m in enumerate(aliases):
+            part = query[m.end():aliases[i + 1].start() if i + 1 < len(aliases) else len(query)]
+            repo = self.repos.get(m.group(2))
+            if repo is None:
+                data[m.group(1)] = None
+                continue
+            files = repo["files"]
+            node: dict = {}
+            if "defaultBranchRef" in part:
+                depth = part.count("entries {") - 1   # one level is the skills listing
+                node["defaultBranchRef"] = {"name": "main", "target": {"tree": {
+                    "oid": hashlib.sha1(json.dumps(sorted(files)).encode()).hexdigest(),
+                    "entries": _graphql_entries(files, "", depth),
+                }}}
+                node["skills"] = {"entries": [
+                    {"name": path.rsplit("/", 1)[1], "type": "blob",
+                     "object": {"text": text, "isTruncated": False}}
+                    for path, text in files.items()
+                    if path.startswith(".claude/skills/") and path.count("/") == 2
+                ]}
+            by_sha = {_blob_sha(text): text for text in files.values()}
+            for b in re.finditer(r'(b\d+): object\(oid: "([0-9a-f]+)"\)', part):
+                text = by_sha.get(b.group(2))
+                node[b.group(1)] = {"text": text, "isTruncated": False} if text is not None else None
+            data[m.group(1)] = node
+        return {"data": data}
+
+
+# ── local bare repos (--github-backend git) ────────────────────────────────────
+
+def _make_bare_repos(root: Path, repos: dict[str, dict]) -> str:
+    """
+    Write each fake repo as a bare git repo under root/<OWNER>/<name>.git and
+    return the base URL for GITHUB_CLONE_URL.  uploadpack.allowFilter lets
+    the collector make real blobless partial clones of them.
+    """
+    git = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.invalid"]
+    for name, repo in repos.items():
+        src = root / "src" / name
+        for path, text in repo["files"].items():
+            (src / path).parent.mkdir(parents=True, exist_ok=True)
+            (src / path).write_text(text, encoding="utf-8")
+        bare = root / OWNER / f"{name}.git"
+        for cmd in (
+            ["init", "--quiet", "--bare", "--initial-branch=main", str(bare)],
+            ["--git-dir", str(bare), "config", "uploadpack.allowFilter", "true"],
+            ["--git-dir", str(bare), "--work-tree", str(src), "add", "--all"],
+            ["--git-dir", str(bare), "--work-tree", str(src), "commit", "--quiet", "-m", name],
+        ):
+            subprocess.run(git + cmd, check=True, capture_output=True)
+    shutil.rmtree(root / "src")
+    return root.as_uri()
+
+
+# ── running the collector ──────────────────────────────────────────────────────
+
+def _collector_env(work: Path, base: str, args: argparse.Namespace, model_log: Path) -> dict:
+    fakes = work / "fakes"
+    if not fakes.exists():
+        shutil.copytree(FAKES_DIR, fakes)
+        claude = fakes / "claude"
+        claude.chmod(claude.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    env = dict(os.environ)
+    for var in ("GH_TOKEN", "GITHUB_TOKEN", "ANTHROPIC_API_KEY", "ANTHROPIC_BASE_URL",
+                "CLAUDECODE", "COLLECT_SKILLS_CACHE"):
+        env.pop(var, None)
+    env.update(
+        GITHUB_API_URL=f"{base}/api",
+        GITHUB_GRAPHQL_URL=f"{base}/graphql",
+        GITHUB_RAW_URL=f"{base}/raw",
+        PATH=f"{fakes}{os.pathsep}{env.get('PATH', '')}",
+        PYTHONPATH=os.pathsep.join(filter(None, [str(fakes), env.get("PYTHONPATH")])),
+        BENCH_MODEL_LATENCY=str(args.model_latency),
+        BENCH_MODEL_LOG=str(model_log),
+    )
+    if args.model == "sdk":
+        env["CLAUDECODE"] = "1"          # skip the CLI, as --no-agent does
+        env["ANTHROPIC_API_KEY"] = "bench"
+        env["BENCH_BATCH_DIR"] = str(work / "batches")
+    return env
+
+
+def _run(cmd: list[str], cwd: Path, env: dict, log: Path) -> tuple[int, float, Optional[float]]:
+    """Run cmd; return (exit code, wall seconds, peak RSS in MB or None)."""
+    start = time.perf_counter()
+    with open(log, "w", encoding="utf-8") as out:
+        proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=out, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+            peak = None
+    return proc.returncode, time.perf_counter() - start, peak
+
+
+def _bench_source(source: str, root: Path, server: _FakeGitHub, args: argparse.Namespace) -> list[dict]:
+    repo = root / "repo"
+    repo.mkdir(parents=True)
+    shutil.copy2(COLLECTOR, repo / COLLECTOR.name)
+    if source == "local":
+        _make_local_folders(repo, args)
+    elif source == "urls":
+        (repo / "skills.txt").write_text(
+            "".join(f"{server.base}/raw/{OWNER}/links/main/{name}/\n" for name in server.url_skills),
+            encoding="utf-8",
+        )
+    model_log = root / "model-calls.log"
+    env = _collector_env(root.parent, server.base, args, model_log)
+    env["COLLECT_SKILLS_CACHE"] = str(root / "cache")
+    cmd = [sys.executable, str(repo / COLLECTOR.name), "--source", source,
+           "--github-user", OWNER, "-j", str(args.jobs)]
+    if source == "local" and args.batch:
+        cmd.append("--batch")
+    if source == "github" and args.github_backend != "rest":
+        cmd += ["--github-backend", args.github_backend]
+        if args.github_backend == "git":
+            env["GITHUB_CLONE_URL"] = server.clone_base
+        else:
+            env["GH_TOKEN"] = "bench"   # the graphql backend needs a token
+
+    results = []
+    for phase in ("cold", "warm"):
+        server.reset()
+        model_log.write_text("", encoding="utf-8")
+        log = root / f"{phase}.log"
+        code, wall, peak = _run(cmd, repo, env, log)
+        stats = dict(server.stats)
+        result = {
+            "scenario": f"{source}/{phase}",
+            "exit": code,
+            "wall_s": round(wall, 3),
+            "requests": stats["requests"],
+            "not_modified": stats["not_modified"],
+            "bytes_down": stats["bytes_down"],
+            "bytes_up": stats["bytes_up"],
+            "model_calls": len(model_log.read_text(encoding="utf-8").splitlines()),
+            "skills": sum(1 for _ in (repo / ".claude" / "skills").glob("*/SKILL.md")),
+            "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        }
+        if code != 0:
+            tail = log.read_text(encoding="utf-8", errors="replace").splitlines()[-15:]
+            print(f"  {result['scenario']}: collector exited {code}; last lines of {log}:")
+            print("\n".join(f"    {line}" for line in tail))
+        results.append(result)
+    return results
+
+
+def _median_runs(runs: list[list[dict]]) -> list[dict]:
+    """Per scenario: median wall time and RSS over the repeats, worst of the rest."""
+    merged = []
+    for repeats in zip(*runs):
+        result = dict(repeats[0])
+        for key in ("wall_s", "peak_rss_mb"):
+            values = sorted(r[key] for r in repeats if r[key] is not None)
+            result[key] = values[len(values) // 2] if values else None
+        for key in ("exit", "requests", "not_modified", "bytes_down", "bytes_up", "model_calls"):
+            result[key] = max(r[key] for r in repeats)
+        result["skills"] = min(r["skills"] for r in repeats)
+        merged.append(result)
+    return merged
+
+
+# ── baseline comparison ────────────────────────────────────────────────────────
+
+def _config(args: argparse.Namespace) -> dict:
+    keys = ("folders", "ready_folders", "docs", "doc_kb", "pdfs", "pdf_kb", "repos", "idle_repos",
+            "skills", "tree_files", "urls", "github_backend", "model", "batch", "model_latency",
+            "http_latency", "jobs")
+    return {k: getattr(args, k) for k in keys}
+
+
+def _compare(result: dict, base: Optional[dict], tolerance: float) -> list[str]:
+    """Human-readable regressions of result against its baseline entry."""
+    if not base:
+        return []
+    problems = []
+    for key in _STRICT_METRICS:
+        if result[key] > base.get(key, result[key]):
+            problems.append(f"{key} {base[key]} -> {result[key]}")
+    if result["skills"] != base.get("skills", result["skills"]):
+        problems.append(f"skills {base['skills']} -> {result['skills']}")
+    for key, limit in (("bytes_down", _BYTES_TOLERANCE), ("bytes_up", _BYTES_TOLERANCE),
+                       ("wall_s", tolerance), ("peak_rss_mb", tolerance)):
+        old, new = base.get(key), result.get(key)
+        if key == "wall_s" and old and new is not None and new - old < _WALL_SLACK_S:
+            continue
+        if old and new is not None and new > old * (1 + limit):
+            problems.append(f"{key} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return problems
+
+
+def _print_table(results: list[dict], baseline: dict[str, dict]) -> None:
+    header = f"  {'scenario':<13}" + "".join(f"{h:>9}" for h, _ in METRICS.values())
+    print(header)
+    for r in results:
+        cells = []
+        for key, (_, fmt) in METRICS.items():
+            value = r.get(key)
+            if value is None:
+                cells.append(f"{'-':>9}")
+                continue
+            if key.startswith("bytes_"):
+                value /= 1024
+            cells.append(f"{fmt.format(value):>9}")
+        line = f"  {r['scenario']:<13}" + "".join(cells)
+        base = baseline.get(r["scenario"])
+        if base and base.get("wall_s"):
+            line += f"   ({(r['wall_s'] / base['wall_s'] - 1) * 100:+.0f}% wall vs baseline)"
+        print(line)
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", nargs="+", choices=SOURCES, default=list(SOURCES),
+                        metavar="SOURCE", help="Sources to benchmark (default: all three)")
+    local = parser.add_argument_group("local source")
+    local.add_argument("--folders", type=int, default=12, metavar="N",
+                       help="Doc folders that need generation (default: 12)")
+    local.add_argument("--ready-folders", type=int, default=8, metavar="N",
+                       help="Folders that already ship a SKILL.md (default: 8)")
+    local.add_argument("--docs", type=int, default=3, metavar="N",
+                       help="Markdown files per folder (default: 3)")
+    local.add_argument("--doc-kb", type=float, default=8, metavar="KB",
+                       help="Size of each markdown file (default: 8)")
+    local.add_argument("--pdfs", type=int, default=1, metavar="N",
+                       help="PDFs per folder (default: 1)")
+    local.add_argument("--pdf-kb", type=float, default=4, metavar="KB",
+                       help="Approximate text per PDF (default: 4)")
+    local.add_argument("--model", choices=["cli", "sdk"], default="cli",
+                       help="Answer generations with the fake claude CLI or fake SDK (default: cli)")
+    local.add_argument("--batch", action="store_true",
+                       help="Pass --batch: one Message Batches submission (needs --model sdk)")
+    local.add_argument("--model-latency", type=float, default=0.05, metavar="SECONDS",
+                       help="Latency of each fake model call (default: 0.05)")
+    gh = parser.add_argument_group("github / urls sources")
+    gh.add_argument("--repos", type=int, default=40, metavar="N",
+                    help="Repos pushed in the last 30 days (default: 40)")
+    gh.add_argument("--idle-repos", type=int, default=10, metavar="N",
+                    help="Repos past the 30-day cutoff (default: 10)")
+    gh.add_argument("--skills", type=int, default=4, metavar="M",
+                    help="Skill files in each repo's .claude/skills/ (default: 4)")
+    gh.add_argument("--tree-files", type=int, default=150, metavar="N",
+                    help="Non-skill files per repo tree (default: 150)")
+    gh.add_argument("--urls", type=int, default=30, metavar="N",
+                    help="skills.txt entries (default: 30)")
+    gh.add_argument("--github-backend", choices=["rest", "graphql", "git"], default="rest",
+                    help="Collector backend for the github source; 'git' clones local "
+                         "bare repos, whose traffic is not counted (default: rest)")
+    gh.add_argument("--http-latency", type=float, default=0.005, metavar="SECONDS",
+                    help="Server-side delay per HTTP request (default: 0.005)")
+    parser.add_argument("-j", "--jobs", type=int, default=8, metavar="N",
+                        help="Passed to collect-skills.py -j (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, metavar="N",
+                        help="Run each source N times; report the median wall time (default: 3)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, metavar="FILE",
+                        help=f"Baseline file (default: {BASELINE.relative_to(BENCH_DIR.parent)})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this run's results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, metavar="FRACTION",
+                        help="Allowed wall-time / RSS growth over the baseline (default: 0.25)")
+    parser.add_argument("--json", type=Path, metavar="FILE",
+                        help="Also write the results to FILE as JSON")
+    parser.add_argument("--keep", action="store_true",
+                        help="Keep the scratch directory (logs, generated skills)")
+    args = parser.parse_args(argv)
+    if args.batch and args.model != "sdk":
+        parser.error("--batch needs --model sdk (the claude CLI has no batches)")
+
+    try:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        stored = {}
+    baseline = stored.get("results", {}) if stored.get("config") == _config(args) else {}
+    if stored and not baseline:
+        print(f"Baseline {args.baseline} was recorded with different settings; not comparing.")
+
+    work = Path(tempfile.mkdtemp(prefix="bench-collect-"))
+    server = _FakeGitHub(_make_repos(args), _make_url_skills(args), args.http_latency)
+    if "github" in args.source and args.github_backend == "git":
+        server.clone_base = _make_bare_repos(work / "git", server.repos)
+    results: list[dict] = []
+    try:
+        for source in args.source:
+            print(f"Benchmarking {source} …")
+            runs = [_bench_source(source, work / f"{source}-{i}", server, args)
+                    for i in range(max(1, args.repeat))]
+            results.extend(_median_runs(runs))
+    finally:
+        server.close()
+        if args.keep:
+            print(f"Scratch directory kept: {work}")
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    print()
+    _print_table(results, baseline)
+
+    failed = [r["scenario"] for r in results if r["exit"] != 0]
+    regressions = {r["scenario"]: _compare(r, baseline.get(r["scenario"]), args.tolerance)
+                   for r in results}
+    regressions = {k: v for k, v in regressions.items() if v}
+
+    if args.json:
+        args.json.write_text(json.dumps({"config": _config(args), "results": results},
+                                        indent=1) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        if failed:
+            print("\nNot updating the baseline: some runs failed.")
+        else:
+            merged = dict(baseline)
+            merged.update({r["scenario"]: {k: v for k, v in r.items() if k not in ("scenario", "exit")}
+                           for r in results})
+            args.baseline.write_text(json.dumps({"config": _config(args), "results": merged},
+                                                indent=1, sort_keys=True) + "\n", encoding="utf-8")
+            print(f"\nBaseline written to {args.baseline}")
+
+    if failed:
+        print(f"\nFAILED: {', '.join(failed)}")
+    if regressions and not args.update_baseline:
+        print("\nRegressions against the baseline:")
+        for scenario, problems in regressions.items():
+            print(f"  {scenario}: " + "; ".join(problems))
+    return 1 if failed or (regressions and not args.update_baseline) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Canned model replies shared by the fake `claude` CLI and the fake `anthropic`
+package.  Both answer the way the collector expects: a single SKILL.md, a
+<<<FILE: …>>> bundle, or condensed notes for a map-reduce chunk.
+
+Environment:
+  BENCH_MODEL_LATENCY  seconds to sleep per call (default 0)
+  BENCH_MODEL_LOG      file that gets one line per call (prompt length)
+"""
+
+import os
+import re
+import time
+
+
+def _skill(name: str) -> str:
+    return (
+        f"---\nname: {name}\n"
+        f"description: Use this skill whenever the user works with {name}: setting it up, "
+        f"calling its API, configuring it or debugging errors. It covers installation, "
+        f"the common commands and their flags, and worked examples.\n---\n\n"
+        f"## Setup\n\nInstall {name} and export its credentials.\n\n"
+        f"## Quick Start\n\n```bash\n{name} init\n{name} run --verbose\n```\n\n"
+        f"## Key Concepts\n\n- Projects group related resources.\n"
+        f"- Every command accepts --help.\n"
+    )
+
+
+def reply(prompt: str) -> str:
+    """Sleep, log the call, and return a plausible model answer for prompt."""
+    time.sleep(float(os.environ.get("BENCH_MODEL_LATENCY", "0")))
+    log = os.environ.get("BENCH_MODEL_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as fh:
+            fh.write(f"{len(prompt)}\n")
+
+    m = re.search(r"(?:named|the name) '([^']+)'", prompt)
+    name = m.group(1) if m else "bench-skill"
+    if "You condense" in prompt:
+        return "## Notes\n\n- condensed reference point\n- another point\n"
+    if "<<<FILE:" in prompt:
+        return (
+            f"<<<FILE: SKILL.md>>>\n{_skill(name)}\n## Topics\n\n- [Setup](setup.md)\n\n"
+            f"<<<FILE: setup.md>>>\n# Setup\n\nInstall {name} with the package manager.\n"
+        )
+    return _skill(name)
@@ -0,0 +1,160 @@
+"""
+Stand-in for the parts of the `anthropic` SDK the collector uses
+(messages.create, streamed or not / messages.stream / messages.batches).  bench_collect.py puts
+the fakes directory first on PYTHONPATH; replies come from _fake_model.
+
+Message batches are kept as JSON files so a later process can resume them:
+  BENCH_BATCH_DIR     where batches are stored (default: <tmp>/fake-anthropic-batches)
+  BENCH_BATCH_STATUS  processing_status retrieve() reports (default: ended)
+"""
+
+import json
+import os
+import tempfile
+import types
+import uuid
+from pathlib import Path
+
+from _fake_model import reply
+
+
+def _message(params: dict):
+    system = params.get("system", "")
+    if not isinstance(system, str):
+        system = json.dumps(system)
+    user = params["messages"][0]["content"]
+    if not isinstance(user, str):
+        user = json.dumps(user)
+    text = reply(system + "\n\n" + user)
+    usage = types.SimpleNamespace(
+        input_tokens=len(user) // 4,
+        cache_creation_input_tokens=0,
+        cache_read_input_tokens=len(system) // 4,
+        output_tokens=len(text) // 4,
+    )
+    return types.SimpleNamespace(
+        content=[types.SimpleNamespace(type="text", text=text)],
+        usage=usage,
+        stop_reason="end_turn",
+    )
+
+
+class _Stream:
+    def __init__(self, params: dict) -> None:
+        self._message = _message(params)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    @property
+    def text_stream(self):
+        text = self._message.content[0].text
+        for i in range(0, len(text), 64):
+            yield text[i:i + 64]
+
+    def get_final_message(self):
+        return self._message
+
+
+class _EventStream:
+    """messages.create(stream=True): the raw server-sent events."""
+
+    def __init__(self, params: dict) -> None:
+        self._message = _message(params)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def __iter__(self):
+        usage = self._message.usage
+        yield types.SimpleNamespace(type="message_start", message=types.SimpleNamespace(
+            usage=types.SimpleNamespace(**dict(vars(usage), output_tokens=1))))
+        text = self._message.content[0].text
+        for i in range(0, len(text), 64):
+            yield types.SimpleNamespace(type="content_block_delta", index=0,
+                                        delta=types.SimpleNamespace(type="text_delta",
+                                                                    text=text[i:i + 64]))
+        yield types.SimpleNamespace(type="message_delta",
+                                    delta=types.SimpleNamespace(stop_reason="end_turn"),
+                                    usage=types.SimpleNamespace(output_tokens=usage.output_tokens))
+        yield types.SimpleNamespace(type="message_stop")
+
+
+def _batch_file(batch_id: str) -> Path:
+    root = os.environ.get("BENCH_BATCH_DIR") or os.path.join(tempfile.gettempdir(),
+                                                             "fake-anthropic-batches")
+    os.makedirs(root, exist_ok=True)
+    return Path(root) / f"{batch_id}.json"
+
+
+class _Batches:
+    def _load(self, batch_id: str) -> dict:
+        path = _batch_file(batch_id)
+        if not path.exists():
+            raise LookupError(f"no such batch: {batch_id}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _view(self, batch_id: str, record: dict):
+        ended = record["canceled"] or os.environ.get("BENCH_BATCH_STATUS", "ended") == "ended"
+        n = len(record["requests"])
+        counts = types.SimpleNamespace(
+            processing=0 if ended else n, succeeded=0 if record["canceled"] or not ended else n,
+            errored=0, canceled=n if record["canceled"] else 0, expired=0,
+        )
+        return types.SimpleNamespace(
+            id=batch_id, processing_status="ended" if ended else "in_progress",
+            request_counts=counts,
+        )
+
+    def create(self, requests: list):
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        record = {"requests": list(requests), "canceled": False}
+        _batch_file(batch_id).write_text(json.dumps(record), encoding="utf-8")
+        return self._view(batch_id, record)
+
+    def retrieve(self, batch_id: str):
+        return self._view(batch_id, self._load(batch_id))
+
+    def cancel(self, batch_id: str):
+        record = self._load(batch_id)
+        record["canceled"] = True
+        _batch_file(batch_id).write_text(json.dumps(record), encoding="utf-8")
+        return self._view(batch_id, record)
+
+    def results(self, batch_id: str):
+        record = self._load(batch_id)
+        for request in record["requests"]:
+            if record["canceled"]:
+                result = types.SimpleNamespace(type="canceled")
+            else:
+                result = types.SimpleNamespace(type="succeeded",
+                                               message=_message(request["params"]))
+            yield types.SimpleNamespace(custom_id=request["custom_id"], result=result)
+
+
+class _Messages:
+    def __init__(self) -> None:
+        self.batches = _Batches()
+
+    def create(self, **params):
+        if params.pop("stream", False):
+            return _EventStream(params)
+        return _message(params)
+
+    def stream(self, **params):
+        return _Stream(params)
+
+
+class Anthropic:
+    def __init__(self, **kwargs) -> None:
+        self.messages = _Messages()
+
+
+class AnthropicBedrock(Anthropic):
+    pass
@@ -16,26 +16,53 @@ Rules enforced (from "The Complete Guide to Building Skills for Claude"):
   - No XML angle brackets (< >) anywhere — security restriction
   - Keep under ~5 000 words per skill file
 
+Search installed skills (BM25 over an index updated after every run):
+  collect-skills.py search QUERY… [-n N]
+
 GitHub rate limits:
   Unauthenticated: 60 req/h.  Set GH_TOKEN or GITHUB_TOKEN env var for 5 000 req/h.
 """
 
 from __future__ import annotations
 
+# http.client (through _http_client()), ssl, urllib.request and
+# importlib.metadata (which pull in the email package) are imported where they
+# are first used, so runs that never touch the network or a PDF do not pay for
+# them at startup.
 import argparse
+import array
+import bisect
+import contextlib
+import functools
+import gzip
 import hashlib
+import heapq
+import importlib.util
 import json
+import math
 import os
+import random
 import re
 import shutil
 import subprocess
 import sys
+import threading
+import time
+import types
 import urllib.error
 import urllib.parse
-import urllib.request
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import http.client
+    import ssl
+
+# --timings: "module load" starts here, after the (cheap) imports above
+_STARTUP_NS = time.perf_counter_ns()
 
 # ── paths ──────────────────────────────────────────────────────────────────────
 
@@ -43,8 +70,14 @@ REPO_ROOT   = Path(__file__).resolve().parent
 SKILLS_DIR  = REPO_ROOT / ".claude" / "skills"
 SKILLS_TXT  = REPO_ROOT / "skills.txt"
 GUIDE_PDF   = REPO_ROOT / "The-Complete-Guide-to-Building-Skill-for-Claude.pdf"
+# Persistent run-to-run state (HTTP cache etc.) — never committed
+CACHE_DIR   = Path(os.environ.get("COLLECT_SKILLS_CACHE") or REPO_ROOT / ".cache" / "collect-skills")
 
 _guide_text_cache: Optional[str] = None   # SDK fallback: extracted once, reused
+_guide_text_lock = threading.Lock()
+
+
+_DEFAULT_GITHUB_USER = "dirkpetersen"
 
 
 def _github_owner_from_remote() -> Optional[str]:
@@ -69,22 +102,675 @@ def _github_owner_from_remote() -> Optional[str]:
 def _guide_text() -> str:
     """Return extracted text from the skill-building guide PDF (cached)."""
     global _guide_text_cache
-    if _guide_text_cache is None:
-        if GUIDE_PDF.exists():
-            text = _extract_pdf_text(GUIDE_PDF)
-            _guide_text_cache = (text or "")[:10000]
-        else:
-            _guide_text_cache = ""
+    with _guide_text_lock:   # parallel generations share one extraction
+        if _guide_text_cache is None:
+            if GUIDE_PDF.exists():
+                text = _extract_pdf_text(GUIDE_PDF)
+                _guide_text_cache = (text or "")[:10000]
+            else:
+                _guide_text_cache = ""
     return _guide_text_cache
 
-GITHUB_API_BASE = "https://api.github.com"
-GITHUB_RAW_BASE = "https://raw.githubusercontent.com"
+GITHUB_API_BASE = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+GITHUB_RAW_BASE = os.environ.get("GITHUB_RAW_URL", "https://raw.githubusercontent.com").rstrip("/")
+GITHUB_CLONE_BASE = os.environ.get("GITHUB_CLONE_URL", "https://github.com").rstrip("/")
+
+
+# ── concurrency ────────────────────────────────────────────────────────────────
+
+_print_lock = threading.Lock()
+
+
+def _log(*args, **kwargs) -> None:
+    """Thread-safe print: lines from worker threads never interleave mid-line."""
+    with _print_lock:
+        print(*args, **kwargs)
+
+
+def _parallel_map(fn, items: list, jobs: int) -> list:
+    """Apply fn to every item using up to `jobs` threads; results keep input order."""
+    if jobs <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+# ── run metrics (--metrics-out / --trace-out) ──────────────────────────────────
+
+class _Metrics:
+    """
+    Instrumentation for one run:
+
+      - wall-clock spans for the phases and for per-item work (folders, PDFs,
+        generations, model calls, repo trees, downloads, URLs);
+      - HTTP requests, response bytes and time per host;
+      - tokens and latency per model call.
+
+    Does nothing until enable(); report() is the --metrics-out JSON,
+    chrome_trace() the trace-event file for chrome://tracing or Perfetto and
+    timings() the --timings breakdown.  Times count from process startup.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter_ns()
+        self._started = time.time()
+        # (category, name, start ns since startup, duration ns, thread id, args)
+        self._spans: list[tuple[str, str, int, int, int, dict]] = []
+        self._threads: dict[int, str] = {}
+        self._hosts: dict[str, dict] = {}
+        self._models: list[dict] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._t0 = _STARTUP_NS
+        self._started = time.time() - (time.perf_counter_ns() - _STARTUP_NS) / 1e9
+
+    def add(self, cat: str, name: str, start_ns: int, end_ns: int, **args) -> None:
+        """Record a span measured elsewhere (perf_counter_ns timestamps)."""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._spans.append((cat, name, start_ns - self._t0, end_ns - start_ns, thread.ident, args))
+
+    @contextlib.contextmanager
+    def span(self, cat: str, name: str, **args):
+        """Time the with-block.  The yielded dict becomes the span's args."""
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            self.add(cat, name, start, time.perf_counter_ns(), **args)
+
+    def http(self, host: str, status: Optional[int], nbytes: int, seconds: float) -> None:
+        """One request on the wire (status None: network error)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            h = self._hosts.setdefault(host, {"requests": 0, "not_modified": 0, "errors": 0,
+                                              "bytes": 0, "seconds": 0.0})
+            h["requests"] += 1
+            h["bytes"] += nbytes
+            h["seconds"] += seconds
+            if status == 304:
+                h["not_modified"] += 1
+            elif status is None or status >= 400:
+                h["errors"] += 1
+
+    def model_call(
+        self, label: str, backend: str, seconds: Optional[float], usage=None,
+        prompt_chars: int = 0, output_chars: int = 0,
+    ) -> None:
+        """One generation or condense call; usage is the SDK's (None for the CLI)."""
+        if not self.enabled:
+            return
+        call = {"label": label, "backend": backend,
+                "seconds": round(seconds, 3) if seconds is not None else None,
+                "prompt_chars": prompt_chars, "output_chars": output_chars}
+        for key, field in (("input_tokens", "input_tokens"), ("output_tokens", "output_tokens"),
+                           ("cache_write_tokens", "cache_creation_input_tokens"),
+                           ("cache_read_tokens", "cache_read_input_tokens")):
+            call[key] = getattr(usage, field, None) if usage is not None else None
+        with self._lock:
+            self._models.append(call)
+
+    def report(self) -> dict:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s[2])
+            hosts = {h: dict(v, seconds=round(v["seconds"], 3)) for h, v in sorted(self._hosts.items())}
+            models = list(self._models)
+        items = [{"category": cat, "name": name, "start_s": round(start / 1e9, 3),
+                  "seconds": round(dur / 1e9, 3), "thread": self._threads.get(tid), **args}
+                 for cat, name, start, dur, tid, args in spans]
+        categories: dict[str, dict] = {}
+        for item in items:
+            if item["category"] == "phase":
+                continue
+            c = categories.setdefault(item["category"], {"count": 0, "seconds": 0.0, "slowest": []})
+            c["count"] += 1
+            c["seconds"] += item["seconds"]
+            c["slowest"].append(item)
+        for c in categories.values():
+            c["seconds"] = round(c["seconds"], 3)
+            c["slowest"] = [{k: v for k, v in i.items() if k not in ("category", "start_s", "thread")}
+                            for i in heapq.nlargest(10, c["slowest"], key=lambda i: i["seconds"])]
+
+        def total(key: str) -> int:
+            return sum(m[key] or 0 for m in models)
+        return {
+            "version": 1,
+            "started": datetime.fromtimestamp(self._started, timezone.utc).isoformat(timespec="seconds"),
+            "wall_s": round((time.perf_counter_ns() - self._t0) / 1e9, 3),
+            "phases": {i["name"]: i["seconds"] for i in items if i["category"] == "phase"},
+            "categories": categories,
+            "http": {
+                "hosts": hosts,
+                "requests": sum(h["requests"] for h in hosts.values()),
+                "bytes": sum(h["bytes"] for h in hosts.values()),
+                "served_from_cache": _http_stats["not_modified"],
+                "retries": _http_stats["retries"],
+            },
+            "models": {
+                "calls": len(models),
+                "seconds": round(sum(m["seconds"] or 0 for m in models), 3),
+                "input_tokens": total("input_tokens"),
+                "output_tokens": total("output_tokens"),
+                "cache_write_tokens": total("cache_write_tokens"),
+                "cache_read_tokens": total("cache_read_tokens"),
+                "per_call": models,
+            },
+            "items": items,
+        }
+
+    def timings(self) -> list[tuple[str, str, float]]:
+        """(category, name, seconds) of the startup and phase spans, in start order."""
+        with self._lock:
+            spans = [s for s in self._spans if s[0] in ("startup", "phase")]
+        return [(cat, name, dur / 1e9) for cat, name, _, dur, _, _ in
+                sorted(spans, key=lambda s: (s[0] != "startup", s[2]))]
+
+    def chrome_trace(self) -> dict:
+        """Trace Event Format: one complete ("X") event per span."""
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s[2])
+            threads = dict(self._threads)
+        tids = {ident: n for n, ident in enumerate(threads, 1)}
+        events: list[dict] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tids[ident], "args": {"name": name}}
+            for ident, name in threads.items()
+        ]
+        events += [
+            {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tids[tid],
+             "ts": start / 1000, "dur": dur / 1000, "args": args}
+            for cat, name, start, dur, tid, args in spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, metrics_out: Optional[Path], trace_out: Optional[Path]) -> None:
+        for dest, data in ((metrics_out, self.report), (trace_out, self.chrome_trace)):
+            if dest is None:
+                continue
+            try:
+                dest.write_text(json.dumps(data(), indent=1, default=str) + "\n", encoding="utf-8")
+                _log(f"  Wrote {dest}")
+            except OSError as exc:
+                _log(f"  WARNING: cannot write {dest}: {exc}")
+
+
+_metrics = _Metrics()
+
+
+def _traced(cat: str, label: Optional[Callable[..., str]] = None) -> Callable:
+    """
+    Record every call of the decorated function as a span in category cat,
+    named by label(*args) (default: the function name).
+    """
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            if not _metrics.enabled:
+                return fn(*args, **kwargs)
+            with _metrics.span(cat, label(*args, **kwargs) if label else fn.__name__):
+                return fn(*args, **kwargs)
+        return traced
+    return decorate
+
+
+# ── HTTP transport ─────────────────────────────────────────────────────────────
+
+@functools.cache
+def _http_client():
+    """The http.client module, imported on first use (see the imports above)."""
+    import http.client
+    return http.client
+
+
+class _ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared by all threads, pooled per host.
+
+    At most `size` requests run concurrently against one host; idle connections
+    are parked and reused, so repeated requests to api.github.com and
+    raw.githubusercontent.com skip the TCP+TLS handshake.  Honors the usual
+    *_proxy environment variables (CONNECT tunnel for https).
+    """
+
+    _MAX_REDIRECTS = 5
+
+    def __init__(self, size: int = 8, timeout: float = 20) -> None:
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list[http.client.HTTPConnection]] = {}
+        self._slots: dict[tuple, threading.BoundedSemaphore] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def configure(self, size: int, timeout: float) -> None:
+        with self._lock:
+            self.size = max(1, size)
+            self.timeout = timeout
+            self._slots.clear()
+
+    @staticmethod
+    def _proxy_for(scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+        import urllib.request
+        proxy = urllib.request.getproxies().get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        return urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+    def _connect(self, scheme: str, host: str, port: Optional[int]) -> http.client.HTTPConnection:
+        import ssl
+        proxy = self._proxy_for(scheme, host)
+        target_host, target_port = (proxy.hostname, proxy.port) if proxy else (host, port)
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            conn = _http_client().HTTPSConnection(
+                target_host, target_port, timeout=self.timeout, context=self._ssl_context)
+            if proxy:
+                conn.set_tunnel(host, port)
+            return conn
+        return _http_client().HTTPConnection(target_host, target_port, timeout=self.timeout)
+
+    def _slot(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.size)
+            return self._slots[key]
+
+    def _checkout(self, key: tuple) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _checkin(self, key: tuple, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _send(
+        self, key: tuple, conn: http.client.HTTPConnection, method: str, target: str,
+        headers: dict, body: Optional[bytes],
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        try:
+            conn.request(method, target, body=body, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (_http_client().HTTPException, OSError):
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        if resp.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return resp.status, resp.headers, body
+
+    def _request_once(
+        self, url: str, headers: dict, method: str = "GET", body: Optional[bytes] = None
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        if parts.scheme == "http" and self._proxy_for("http", parts.hostname):
+            target = url   # plain-http proxies take the absolute URL
+        with self._slot(key):
+            conn = self._checkout(key)
+            if conn is not None:
+                try:
+                    return self._send(key, conn, method, target, headers, body)
+                except (_http_client().HTTPException, OSError):
+                    pass   # parked connection was closed by the server; reconnect
+            conn = self._connect(parts.scheme, parts.hostname, parts.port)
+            return self._send(key, conn, method, target, headers, body)
+
+    def get(self, url: str, headers: dict) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """GET url following redirects; returns (status, headers, body) for any status."""
+        headers = {"Accept-Encoding": "gzip", **headers}
+        for _ in range(self._MAX_REDIRECTS + 1):
+            try:
+                status, resp_headers, body = self._request_once(url, headers)
+            except (_http_client().HTTPException, OSError) as exc:
+                raise urllib.error.URLError(exc) from exc
+            location = resp_headers.get("Location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return status, resp_headers, body
+            new_url = urllib.parse.urljoin(url, location)
+            if urllib.parse.urlsplit(new_url).hostname != urllib.parse.urlsplit(url).hostname:
+                # never forward credentials to a different host
+                headers = {k: v for k, v in headers.items() if k.lower() != "authorization"}
+            url = new_url
+        raise urllib.error.URLError(f"too many redirects for {url}")
+
+    def post(
+        self, url: str, headers: dict, body: bytes
+    ) -> tuple[int, http.client.HTTPMessage, bytes]:
+        """POST body to url (no redirects); returns (status, headers, body) for any status."""
+        headers = {"Accept-Encoding": "gzip", **headers}
+        try:
+            return self._request_once(url, headers, "POST", body)
+        except (_http_client().HTTPException, OSError) as exc:
+            raise urllib.error.URLError(exc) from exc
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+_http_pool = _ConnectionPool()
+
+
+# ── rate limiting and retries ──────────────────────────────────────────────────
+
+_RATE_LIMIT_RESERVE  = 0.1     # below this fraction of the quota, pace requests
+_RATE_LIMIT_MAX_PACE = 5.0     # longest gap (seconds) between paced requests
+_RATE_LIMIT_MAX_WAIT = 900     # longest wait (seconds) for a quota reset or Retry-After
+_RETRY_ATTEMPTS      = 4       # retries after the first try
+_RETRY_BASE_DELAY    = 1.0     # seconds; doubled per attempt, with jitter
+
+# Work dropped after retries were exhausted, and folders whose generation
+# could not finish; both are reported at the end of the run.
+_skipped_work: list[str] = []
+_failed_generations: list[str] = []
+_skipped_lock = threading.Lock()
+
+
+def _record_skipped(url: str, reason: str) -> None:
+    with _skipped_lock:
+        _skipped_work.append(f"{url} ({reason})")
+
+
+class _RateLimiter:
+    """
+    Token-bucket model of each GitHub quota, fed by X-RateLimit-* headers.
+
+    Every request takes a token; each response resets the bucket to the
+    server's X-RateLimit-Remaining, and the bucket refills at
+    X-RateLimit-Reset.  Once fewer than _RATE_LIMIT_RESERVE of the limit
+    remain, requests are spread evenly over the rest of the window instead
+    of running the quota dry (at most _RATE_LIMIT_MAX_PACE apart); an empty
+    bucket waits for the reset.  Hosts
+    that send no rate-limit headers (raw.githubusercontent.com) are not paced.
+    """
+
+    @staticmethod
+    def resource(url: str) -> str:
+        """Quota a URL draws from: GitHub's REST 'core' and 'graphql' are separate."""
+        if url == GITHUB_GRAPHQL_URL:
+            return "graphql"
+        if url.startswith(GITHUB_API_BASE + "/"):
+            return "core"
+        return urllib.parse.urlsplit(url).hostname or ""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, dict] = {}
+
+    def update(self, resource: str, headers: http.client.HTTPMessage) -> None:
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            limit = int(headers["X-RateLimit-Limit"])
+            reset = float(headers["X-RateLimit-Reset"])
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            bucket = self._buckets.setdefault(resource, {"next": 0.0})
+            bucket.update(tokens=remaining, limit=max(limit, 1), reset=reset)
+
+    def wait_time(self, resource: str) -> float:
+        """Take a token from resource's bucket, returning how long to sleep first."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            now = time.time()
+            if not bucket or now >= bucket["reset"]:
+                self._buckets.pop(resource, None)
+                return 0.0
+            if bucket["tokens"] <= 0:
+                return bucket["reset"] - now + 1
+            bucket["tokens"] -= 1
+            if bucket["tokens"] >= bucket["limit"] * _RATE_LIMIT_RESERVE:
+                return 0.0
+            interval = min((bucket["reset"] - now) / (bucket["tokens"] + 1),
+                           _RATE_LIMIT_MAX_PACE)
+            start = max(now, bucket["next"])
+            bucket["next"] = start + interval
+            return start - now
+
+
+_rate_limiter = _RateLimiter()
+
+
+def _retry_delay(
+    status: int, headers: http.client.HTTPMessage, body: bytes, attempt: int
+) -> Optional[float]:
+    """Seconds to wait before retrying this response, or None if it is final."""
+    throttled = status == 429 or (status == 403 and (
+        headers.get("X-RateLimit-Remaining") == "0"
+        or "Retry-After" in headers
+        or b"rate limit" in body[:1000].lower()
+    ))
+    if not throttled and status < 500:
+        return None
+    try:
+        return float(headers["Retry-After"])
+    except (TypeError, ValueError):
+        pass
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time()) + 1
+        except (TypeError, ValueError):
+            pass
+    return _RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5)
+
+
+def _scheduled_request(
+    method: str, url: str, headers: dict, body: Optional[bytes] = None
+) -> tuple[int, http.client.HTTPMessage, bytes]:
+    """
+    Send a request through the rate limiter, retrying throttled (403/429),
+    5xx and network failures with jittered exponential backoff.  When the
+    retries or the wait budget run out, the URL is recorded as skipped work
+    and the last response (or URLError) is passed on to the caller.
+    """
+    host = urllib.parse.urlsplit(url).hostname or ""
+    resource = _rate_limiter.resource(url)
+    attempt = 0
+    while True:
+        wait = _rate_limiter.wait_time(resource)
+        if wait > _RATE_LIMIT_MAX_WAIT:
+            _record_skipped(url, f"rate limit exhausted for {int(wait)}s")
+            raise urllib.error.HTTPError(url, 403, "rate limit exhausted", None, None)
+        if wait >= 5:
+            _log(f"    {host}: quota low, waiting {wait:.0f}s")
+        if wait > 0:
+            time.sleep(wait)
+        started = time.perf_counter()
+        try:
+            if method == "GET":
+                status, resp_headers, resp_body = _http_pool.get(url, headers)
+            else:
+                status, resp_headers, resp_body = _http_pool.post(url, headers, body or b"")
+        except urllib.error.URLError as exc:
+            _metrics.http(host, None, 0, time.perf_counter() - started)
+            if attempt == _RETRY_ATTEMPTS:
+                _record_skipped(url, f"network error: {exc.reason}")
+                raise
+            delay, reason = _RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5), "network error"
+        else:
+            _metrics.http(host, status, len(resp_body), time.perf_counter() - started)
+            _rate_limiter.update(resource, resp_headers)
+            delay = _retry_delay(status, resp_headers, resp_body, attempt)
+            if delay is None:
+                return status, resp_headers, resp_body
+            if attempt == _RETRY_ATTEMPTS or delay > _RATE_LIMIT_MAX_WAIT:
+                _record_skipped(url, f"HTTP {status} after {attempt + 1} attempt(s)")
+                return status, resp_headers, resp_body
+            reason = f"HTTP {status}"
+        with _http_stats_lock:
+            _http_stats["retries"] += 1
+        if delay >= 5:
+            _log(f"    {host}: {reason}, retrying in {delay:.0f}s")
+        time.sleep(delay)
+        attempt += 1
+
+
+# ── HTTP cache ─────────────────────────────────────────────────────────────────
+
+# Responses are stored as CACHE_DIR/http/<sha256(url)>.json (validators) plus
+# a .body file; revalidated with If-None-Match / If-Modified-Since each run.
+_HTTP_CACHE_MAX_AGE   = 30 * 86400           # seconds since last use
+_HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024    # total body bytes kept on disk
+
+_http_cache_enabled = True
+_http_stats = {"requests": 0, "not_modified": 0, "retries": 0}
+_http_stats_lock = threading.Lock()
+
+
+def _http_cache_paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha256(url.encode()).hexdigest()
+    base = CACHE_DIR / "http" / key
+    return base.with_suffix(".json"), base.with_suffix(".body")
+
+
+def _http_cache_load(url: str) -> Optional[tuple[dict, bytes]]:
+    meta_file, body_file = _http_cache_paths(url)
+    try:
+        meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        return meta, body_file.read_bytes()
+    except (OSError, ValueError):
+        return None
+
+
+def _http_cache_store(url: str, headers, body: bytes) -> None:
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return  # nothing to revalidate against
+    meta_file, body_file = _http_cache_paths(url)
+    meta = {"url": url, "etag": etag, "last_modified": last_modified}
+    try:
+        meta_file.parent.mkdir(parents=True, exist_ok=True)
+        # body first, then validators: a torn write never pairs new ETag with old body
+        for dest, data in ((body_file, body), (meta_file, json.dumps(meta).encode())):
+            tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, dest)
+    except OSError as exc:
+        _log(f"    WARNING: cannot write HTTP cache entry: {exc}")
+
+
+def _http_get(url: str, headers: dict) -> bytes:
+    """
+    GET url over the shared connection pool and return the body, revalidating
+    against the on-disk cache.  A 304 Not Modified is served from the cache;
+    other non-2xx statuses raise HTTPError, network failures URLError.
+    """
+    with _http_stats_lock:
+        _http_stats["requests"] += 1
+    cached = _http_cache_load(url) if _http_cache_enabled else None
+    headers = dict(headers)
+    if cached:
+        meta, _ = cached
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    status, resp_headers, body = _scheduled_request("GET", url, headers)
+    if status == 304 and cached:
+        with _http_stats_lock:
+            _http_stats["not_modified"] += 1
+        for f in _http_cache_paths(url):
+            try:
+                os.utime(f)   # mark as recently used for pruning
+            except OSError:
+                pass
+        return cached[1]
+    if status >= 300:
+        raise urllib.error.HTTPError(url, status, _http_client().responses.get(status, ""),
+                                     resp_headers, None)
+    if _http_cache_enabled:
+        _http_cache_store(url, resp_headers, body)
+    return body
+
+
+def _prune_http_cache(verbose: bool) -> None:
+    """Evict entries unused for _HTTP_CACHE_MAX_AGE, then oldest-first down to the size cap."""
+    http_dir = CACHE_DIR / "http"
+    if not http_dir.is_dir():
+        return
+    now = datetime.now(timezone.utc).timestamp()
+    entries: list[tuple[float, int, Path]] = []
+    for body_file in http_dir.glob("*.body"):
+        try:
+            st = body_file.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, body_file))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, body_file in entries:
+        if now - mtime < _HTTP_CACHE_MAX_AGE and total <= _HTTP_CACHE_MAX_BYTES:
+            continue
+        for f in (body_file, body_file.with_suffix(".json")):
+            try:
+                f.unlink()
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+    if removed and verbose:
+        _log(f"  HTTP cache: pruned {removed} stale entr{'y' if removed == 1 else 'ies'}")
+
+
+# ── persistent state ───────────────────────────────────────────────────────────
+
+def _load_state(name: str) -> dict:
+    """Load CACHE_DIR/<name>.json ({} if missing or unreadable)."""
+    try:
+        return json.loads((CACHE_DIR / f"{name}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(name: str, data: dict) -> None:
+    """Atomically replace CACHE_DIR/<name>.json."""
+    dest = CACHE_DIR / f"{name}.json"
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, dest)
+    except OSError as exc:
+        _log(f"    WARNING: cannot write {dest}: {exc}")
 
 
 # ── GitHub helpers ─────────────────────────────────────────────────────────────
 
+def _github_token() -> Optional[str]:
+    return os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+
+
 def _github_headers() -> dict:
-    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    token = _github_token()
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "User-Agent": "collect-skills/1.0",
@@ -95,27 +781,52 @@ def _github_headers() -> dict:
 
 
 def _github_get(url: str) -> Optional[dict | list]:
-    req = urllib.request.Request(url, headers=_github_headers())
     try:
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            return json.loads(resp.read())
+        return json.loads(_http_get(url, _github_headers()))
     except urllib.error.HTTPError as exc:
         if exc.code == 404:
             return None
         if exc.code == 403:
-            print(f"    WARNING: GitHub rate-limit hit. Set GH_TOKEN for higher quota.")
+            if exc.headers is None or exc.headers.get("X-RateLimit-Remaining") == "0":
+                _log(f"    WARNING: GitHub rate-limit hit. Set GH_TOKEN for higher quota.")
+            else:
+                _log(f"    WARNING: GitHub denied access to {url} (HTTP 403)")
+            return None
+        if exc.code == 429 or exc.code >= 500:
+            _log(f"    WARNING: GitHub request failed after retries: {url} (HTTP {exc.code})")
             return None
         raise
     except urllib.error.URLError as exc:
-        print(f"    WARNING: network error fetching {url}: {exc}")
+        _log(f"    WARNING: network error fetching {url}: {exc}")
         return None
 
 
+def _github_graphql(query: str) -> Optional[dict]:
+    """POST a GraphQL query; returns its `data` (possibly partial) or None on failure."""
+    with _http_stats_lock:
+        _http_stats["requests"] += 1
+    try:
+        status, _, body = _scheduled_request(
+            "POST", GITHUB_GRAPHQL_URL, {**_github_headers(), "Content-Type": "application/json"},
+            json.dumps({"query": query}).encode(),
+        )
+        reply = json.loads(body) if status < 300 else None
+    except (urllib.error.URLError, ValueError) as exc:   # HTTPError is a URLError
+        _log(f"    WARNING: GraphQL request failed: {exc}")
+        return None
+    if reply is None:
+        _log(f"    WARNING: GraphQL request failed: HTTP {status}")
+        return None
+    for err in reply.get("errors") or []:
+        _log(f"    WARNING: GraphQL: {err.get('message', err)}")
+    return reply.get("data")
+
+
+@_traced("download", lambda url: url)
 def _fetch_raw(url: str) -> Optional[str]:
-    req = urllib.request.Request(url, headers={"User-Agent": "collect-skills/1.0"})
     try:
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            return resp.read().decode("utf-8", errors="replace")
+        body = _http_get(url, {"User-Agent": "collect-skills/1.0"})
+        return body.decode("utf-8", errors="replace")
     except (urllib.error.HTTPError, urllib.error.URLError):
         return None
 
@@ -175,81 +886,316 @@ _LARGE_CONTENT_THRESHOLD = 50_000  # characters
 # Delimiter that separates files in a multi-file LLM response
 _BUNDLE_SEP = "<<<FILE:"
 
+# Concurrency caps for in-flight model calls (set from --cli-jobs / --sdk-jobs)
+_cli_slots = threading.BoundedSemaphore(2)
+_sdk_slots = threading.BoundedSemaphore(4)
+
 # Bedrock model for large context
 _LARGE_BEDROCK_MODEL = "us.anthropic.claude-sonnet-4-6"
 _LARGE_SDK_MODEL     = "claude-sonnet-4-6"  # direct API version
 
 
-def _parse_skill_bundle(response: str) -> dict[str, str]:
+_BUNDLE_MARKER_RE   = re.compile(r"<<<FILE:\s*([^>]+)>>>")
+# Sub-files live next to SKILL.md: plain names only, never a path
+_BUNDLE_FILENAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*\.md")
+
+_PARTIAL_BUNDLE_DIR = "partial-bundles"   # inside CACHE_DIR: files of a dropped stream
+
+
+class _BundleRejected(Exception):
+    """Raised from _BundleParser.feed to stop a stream whose SKILL.md is invalid."""
+
+
+class _BundleParser:
     """
-    Parse a potentially multi-file LLM response into {filename: content}.
+    Incremental parser for a multi-file LLM response:
 
-    Expects sections delimited by:
         <<<FILE: SKILL.md>>>
         ...content...
         <<<FILE: setup.md>>>
         ...content...
 
+    feed() takes the response in pieces of any size, as they stream in; each
+    section is cleaned up and added to `files` as soon as the next marker
+    shows that it is complete, so only the section in progress is buffered.
+    With `progress` (the skill name) every completed file is printed, and an
+    invalid SKILL.md raises _BundleRejected at once rather than after the
+    rest of the bundle has been generated.  With `stage`, completed files are
+    also written to that directory as they complete.
+    """
+
+    _MAX_MARKER = 256   # longest marker held back while it may still be arriving
+
+    def __init__(self, progress: Optional[str] = None, stage: Optional[Path] = None) -> None:
+        self.files: dict[str, str] = {}
+        self.report: Optional[SkillReport] = None   # SKILL.md, once complete
+        self._progress = progress
+        self._stage = stage
+        self._started = time.monotonic()
+        self._pieces: list[str] = []       # section in progress, marker-free
+        self._tail = ""                    # end of the input that may begin a marker
+        self._name: Optional[str] = None   # file of the section in progress
+
+    def feed(self, text: str) -> None:
+        text = self._tail + text
+        pos = 0
+        while m := _BUNDLE_MARKER_RE.search(text, pos):
+            if self._name is not None:
+                self._pieces.append(text[pos:m.start()])
+                self._complete(self._name, "".join(self._pieces))
+            # text before the first marker is preamble and dropped
+            self._pieces = []
+            self._name = m.group(1).strip()
+            pos = m.end()
+        cut = self._marker_start(text, pos)
+        self._pieces.append(text[pos:cut])
+        self._tail = text[cut:]
+
+    @classmethod
+    def _marker_start(cls, text: str, pos: int) -> int:
+        """Offset from which text[pos:] may be the start of a marker still arriving."""
+        start = text.rfind(_BUNDLE_SEP, max(pos, len(text) - cls._MAX_MARKER))
+        if start != -1 and ">" not in text[start:].rstrip(">"):
+            return start
+        for k in range(len(_BUNDLE_SEP) - 1, 0, -1):   # a marker cut inside "<<<FILE:"
+            if len(text) - k >= pos and text.endswith(_BUNDLE_SEP[:k]):
+                return len(text) - k
+        return len(text)
+
+    def close(self, truncated: bool = False) -> dict[str, str]:
+        """
+        End of the response: complete the last section and return the files.
+        A truncated response (dropped stream) discards the unfinished section.
+        """
+        rest = "".join(self._pieces) + self._tail
+        if self._name is None:
+            # no markers: a single-file response, possibly with preamble
+            if rest.strip() and not truncated:
+                self._complete("SKILL.md", _extract_skill_from_response(rest))
+        elif not truncated:
+            self._complete(self._name, rest)
+        self._pieces, self._tail, self._name = [], "", None
+        return self.files
+
+    def _complete(self, name: str, raw: str) -> None:
+        if name != "SKILL.md" and not _BUNDLE_FILENAME_RE.fullmatch(name):
+            _log(f"    WARNING: ignoring generated file with unsafe name {name!r}")
+            return
+        content = _strip_code_fence(raw)
+        if not content:
+            return
+        self.files[name] = content
+        if self._progress is not None:
+            _log(f"    {self._progress}/{name} complete ({len(content):,} chars, "
+                  f"{time.monotonic() - self._started:.0f}s)")
+            if name == "SKILL.md":
+                self.report = validate_skill(content)
+                if self.report.reason():
+                    raise _BundleRejected(f"generated SKILL.md invalid: {self.report.reason()}")
+        if self._stage is not None:
+            _write_atomic(self._stage / name, content)
+
+
+def _parse_skill_bundle(response: str) -> dict[str, str]:
+    """
+    Parse a complete, potentially multi-file LLM response into {filename: content}.
     Falls back to {"SKILL.md": extracted_content} for single-file responses.
     """
-    if _BUNDLE_SEP not in response:
-        return {"SKILL.md": _extract_skill_from_response(response)}
-
-    files: dict[str, str] = {}
-    # re.split keeps the captured groups when there's a group in the pattern
-    parts = re.split(r"<<<FILE:\s*([^>]+)>>>", response)
-    # parts[0] = text before first marker (ignore)
-    # parts[1] = filename, parts[2] = content, parts[3] = filename, ...
-    for i in range(1, len(parts) - 1, 2):
-        filename = parts[i].strip()
-        content  = _strip_code_fence(parts[i + 1])
-        if content:
-            files[filename] = content
-    return files if files else {"SKILL.md": _extract_skill_from_response(response)}
+    parser = _BundleParser()
+    parser.feed(response)
+    return parser.close() or {"SKILL.md": _extract_skill_from_response(response)}
+
+
+# ── skill validation ───────────────────────────────────────────────────────────
+
+_SKILL_MAX_WORDS   = 5000        # guide: keep SKILL.md under ~5,000 words
+_SKILL_NAME_MAX    = 64
+_SKILL_DESC_MAX    = 1024
+_RESERVED_PREFIXES = ("claude", "anthropic")
+
+# Fenced blocks need a closing ``` (an unterminated fence is not code);
+# `inline code` may span lines.  Fences are blanked before inline spans.
+_FENCE_RE           = re.compile(r"```.*?```", re.DOTALL)
+_INLINE_CODE_RE     = re.compile(r"`[^`]+`")
+_NOT_NEWLINE_RE     = re.compile(r"[^\n]")
+_BRACKET_RE         = re.compile(r"[<>]")
+_FRONTMATTER_KEY_RE = re.compile(r"^([^:\n]+):", re.MULTILINE)
+
+
+class SkillReport:
+    """
+    Outcome of validate_skill(): the parsed frontmatter plus every rule
+    violation as (severity, rule, line, message), line 0 meaning the whole
+    file.  Errors make a skill invalid; warnings are advisory.
+    """
+
+    def __init__(self, content: str) -> None:
+        self.meta, self.body = parse_frontmatter(content)
+        nl = content.find("\n")
+        self.first_line = content if nl == -1 else content[:nl]
+        self.key_lines: dict[str, int] = {}   # frontmatter key -> line number
+        self.bracket_lines: list[int] = []    # < or > outside code spans / fences
+        self.body_words = 0                   # exact once over _SKILL_MAX_WORDS
+        self.violations: list[tuple[str, str, int, str]] = []
+
+    @property
+    def ok(self) -> bool:
+        return not any(sev == "error" for sev, _, _, _ in self.violations)
+
+    @property
+    def warnings(self) -> list[tuple[str, str, int, str]]:
+        return [v for v in self.violations if v[0] == "warning"]
+
+    def reason(self) -> Optional[str]:
+        """The first error as a human-readable string, or None if valid."""
+        for sev, _, line, message in self.violations:
+            if sev == "error":
+                return f"{message} (line {line})" if line else message
+        return None
+
+
+def _scan_skill(content: str, report: SkillReport) -> None:
+    """
+    Blank out fenced blocks, then inline code; any < or > left over is
+    outside code.  The masking only runs when the file has a bracket at all.
+    Frontmatter key lines come from the (short) frontmatter block.
+    """
+    if content.startswith("---"):
+        end = content.find("\n---", 3)
+        if end != -1:
+            for m in _FRONTMATTER_KEY_RE.finditer(content, 0, end):
+                report.key_lines.setdefault(
+                    m.group(1).strip(), content.count("\n", 0, m.start()) + 1)
+
+    # Words are whitespace-separated, so whitespace count + 1 bounds them;
+    # only split (and allocate) when that bound is over the limit.
+    body = report.body
+    bound = body.count(" ") + body.count("\n") + body.count("\t") + 1
+    report.body_words = len(body.split()) if bound > _SKILL_MAX_WORDS else bound
+
+    if "<" not in content and ">" not in content:
+        return
+    # Code is blanked out but newlines are kept, so offsets in `masked` are
+    # offsets in `content` and line numbers need no second pass.
+    def blank(m: re.Match) -> str:
+        return _NOT_NEWLINE_RE.sub(" ", m.group())
+
+    masked = _INLINE_CODE_RE.sub(blank, _FENCE_RE.sub(blank, content))
+    line, counted = 1, 0
+    for m in _BRACKET_RE.finditer(masked):
+        line += masked.count("\n", counted, m.start())
+        counted = m.start()
+        if not report.bracket_lines or report.bracket_lines[-1] != line:
+            report.bracket_lines.append(line)
+
+
+# Rule registry: (rule id, severity, check).  A check returns (line, message)
+# pairs; errors are listed first so SkillReport.reason() keeps the order below.
+_SKILL_RULES: list[tuple[str, str, Callable[["SkillReport"], list[tuple[int, str]]]]] = []
+
+
+def _skill_rule(rule: str, severity: str = "error") -> Callable:
+    def register(check: Callable) -> Callable:
+        _SKILL_RULES.append((rule, severity, check))
+        return check
+    return register
+
+
+@_skill_rule("name-missing")
+def _rule_name_missing(r: SkillReport) -> list[tuple[int, str]]:
+    if r.meta.get("name"):
+        return []
+    return [(0, f"no 'name' in frontmatter (first line: {r.first_line[:80]!r})")]
+
+
+@_skill_rule("description-missing")
+def _rule_description_missing(r: SkillReport) -> list[tuple[int, str]]:
+    if r.meta.get("description"):
+        return []
+    return [(0, f"no 'description' in frontmatter (name={r.meta.get('name', '')})")]
+
+
+@_skill_rule("name-format")
+def _rule_name_format(r: SkillReport) -> list[tuple[int, str]]:
+    name = r.meta.get("name", "")
+    if name and re.search(r"[A-Z \t]", name):
+        return [(r.key_lines.get("name", 0), f"name {name!r} has uppercase or spaces")]
+    return []
+
+
+@_skill_rule("angle-brackets")
+def _rule_angle_brackets(r: SkillReport) -> list[tuple[int, str]]:
+    # no XML angle brackets (security rule from the guide)
+    return [(line, "contains < or > outside code fences") for line in r.bracket_lines]
+
+
+@_skill_rule("word-count", "warning")
+def _rule_word_count(r: SkillReport) -> list[tuple[int, str]]:
+    if r.body_words <= _SKILL_MAX_WORDS:
+        return []
+    return [(0, f"body has {r.body_words} words (guide: under {_SKILL_MAX_WORDS}; "
+                f"move detail into reference files)")]
+
+
+@_skill_rule("reserved-name", "warning")
+def _rule_reserved_name(r: SkillReport) -> list[tuple[int, str]]:
+    name = r.meta.get("name", "").lower()
+    line = r.key_lines.get("name", 0)
+    found = []
+    if name.startswith(_RESERVED_PREFIXES):
+        found.append((line, f"name {name!r} starts with a reserved prefix "
+                            f"({' / '.join(_RESERVED_PREFIXES)})"))
+    if len(name) > _SKILL_NAME_MAX:
+        found.append((line, f"name is {len(name)} characters (max {_SKILL_NAME_MAX})"))
+    return found
+
+
+@_skill_rule("description-quality", "warning")
+def _rule_description_quality(r: SkillReport) -> list[tuple[int, str]]:
+    desc = r.meta.get("description", "")
+    if not desc:
+        return []
+    line = r.key_lines.get("description", 0)
+    found = []
+    if len(desc) > _SKILL_DESC_MAX:
+        found.append((line, f"description is {len(desc)} characters (max {_SKILL_DESC_MAX})"))
+    if len(desc.split()) < 8:
+        found.append((line, "description is very short; say what the skill does and when to use it"))
+    elif not re.search(r"\b(use|when|whenever)\b", desc, re.IGNORECASE):
+        found.append((line, "description does not say when to use the skill"))
+    return found
+
+
+def validate_skill(content: str) -> SkillReport:
+    """Check content against every registered rule in one scan; see SkillReport."""
+    report = SkillReport(content or "")
+    if not content or not content.strip():
+        report.violations.append(("error", "empty", 0, "empty content"))
+        return report
+    _scan_skill(content, report)
+    for severity in ("error", "warning"):
+        for rule, sev, check in _SKILL_RULES:
+            if sev == severity:
+                report.violations.extend(
+                    (sev, rule, line, message) for line, message in check(report))
+    return report
+
+
+def _print_skill_warnings(report: SkillReport, label: str, verbose: bool) -> None:
+    if verbose:
+        for _, rule, line, message in report.warnings:
+            where = f":{line}" if line else ""
+            _log(f"    note: {label}{where}: {message} [{rule}]")
 
 
 def is_valid_skill(content: str) -> bool:
     """Quick validity check: needs --- delimiters, name, and description."""
-    meta, _ = parse_frontmatter(content)
-    name = meta.get("name", "")
-    desc = meta.get("description", "")
-    if not name or not desc:
-        return False
-    # name must be kebab-case (no spaces, no upper case)
-    if re.search(r"[A-Z \t]", name):
-        return False
-    # no XML angle brackets (security rule from the guide)
-    if "<" in content or ">" in content:
-        # Allow markdown code fences containing < > only inside ``` blocks
-        # Simple heuristic: reject if < or > appears outside code blocks
-        stripped = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
-        stripped = re.sub(r"`[^`]+`", "", stripped)
-        if "<" in stripped or ">" in stripped:
-            return False
-    return True
+    return validate_skill(content).ok
 
 
 def _skill_rejection_reason(content: str) -> Optional[str]:
     """Return a human-readable reason if content is not a valid skill, else None."""
-    if not content or not content.strip():
-        return "empty content"
-    meta, _ = parse_frontmatter(content)
-    name = meta.get("name", "")
-    desc = meta.get("description", "")
-    if not name:
-        first_line = content.split("\n", 1)[0][:80]
-        return f"no 'name' in frontmatter (first line: {first_line!r})"
-    if not desc:
-        return f"no 'description' in frontmatter (name={name})"
-    if re.search(r"[A-Z \t]", name):
-        return f"name {name!r} has uppercase or spaces"
-    # angle bracket check
-    if "<" in content or ">" in content:
-        stripped = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
-        stripped = re.sub(r"`[^`]+`", "", stripped)
-        if "<" in stripped or ">" in stripped:
-            return "contains < or > outside code fences"
-    return None
+    return validate_skill(content).reason()
 
 
 def sanitize_name(name: str) -> str:
@@ -279,8 +1225,625 @@ GENERIC_SKILLS = {
 }
 
 
+# ── skill catalog ──────────────────────────────────────────────────────────────
+
+CATALOG_FILE = "catalog.json"   # inside SKILLS_DIR
+
+
+def _catalog_file_info(content: str) -> dict:
+    data = content.encode("utf-8")
+    return {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "words": len(content.split()),
+    }
+
+
+class _SkillCatalog:
+    """
+    SKILLS_DIR/catalog.json — one entry per installed skill folder:
+
+        {"version": 1, "skills": {"<dir>": {
+            "name", "description", "source", "sha256", "size", "words",
+            "files": {"<sub-file>.md": {"sha256", "size", "words"}}}}}
+
+    where the top-level hash/size/words describe SKILL.md.  Loaded once per
+    run and reconciled with one scandir per folder: folders added or removed
+    by hand are picked up, and a file is only re-read when its stat differs
+    from CACHE_DIR/catalog-stat.json (kept out of the catalog so the
+    committed file is machine-independent).  Installers update entries in
+    memory; save() writes both files atomically.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._skills: Optional[dict[str, dict]] = None
+        self._stats: dict[str, list] = {}
+        self._sorted: Optional[list[str]] = None
+        self._dirty = False
+
+    def _entries(self) -> dict[str, dict]:
+        with self._lock:
+            if self._skills is None:
+                self._load()
+            return self._skills
+
+    def _load(self) -> None:
+        try:
+            data = json.loads((SKILLS_DIR / CATALOG_FILE).read_text(encoding="utf-8"))
+            stored = data.get("skills", {})
+        except (OSError, ValueError, AttributeError):
+            stored = {}
+        self._stats = _load_state("catalog-stat")
+        try:
+            dirs = sorted(e.name for e in os.scandir(SKILLS_DIR)
+                          if e.is_dir() and not e.name.startswith("."))
+        except OSError:
+            dirs = []
+        self._skills = {}
+        for d in dirs:
+            entry = self._reconcile(d, stored.get(d) or {})
+            if entry:
+                self._skills[d] = entry
+        self._dirty = self._skills != stored
+        self._sorted = None
+
+    def _reconcile(self, skill_dir: str, old: dict) -> Optional[dict]:
+        """Entry for one folder, re-reading only files whose stat has changed."""
+        folder = SKILLS_DIR / skill_dir
+        try:
+            found = sorted((e.name, e.stat()) for e in os.scandir(folder)
+                           if e.is_file() and e.name.endswith(".md"))
+        except OSError:
+            return None
+        old_files = dict(old.get("files", {}))
+        if old.get("sha256"):
+            old_files["SKILL.md"] = {k: old[k] for k in ("sha256", "size", "words")}
+        entry: dict = {k: old[k] for k in ("name", "description", "source") if k in old}
+        entry["files"] = {}
+        for name, st in found:
+            key = f"{skill_dir}/{name}"
+            if name in old_files and self._stats.get(key) == [st.st_size, st.st_mtime_ns]:
+                info = old_files[name]
+            else:
+                content = (folder / name).read_text(encoding="utf-8", errors="replace")
+                info = _catalog_file_info(content)
+                self._note_stat(key, st)
+                if name == "SKILL.md":
+                    meta, _ = parse_frontmatter(content)
+                    entry["name"] = meta.get("name") or skill_dir
+                    entry["description"] = meta.get("description", "")
+            if name == "SKILL.md":
+                entry.update(info)
+            else:
+                entry["files"][name] = info
+        return entry if found else None
+
+    def _note_stat(self, key: str, st: Optional[os.stat_result] = None) -> None:
+        try:
+            st = st or (SKILLS_DIR / key).stat()
+        except OSError:
+            self._stats.pop(key, None)
+            return
+        if time.time_ns() - st.st_mtime_ns < _RACY_MTIME_NS:
+            self._stats.pop(key, None)   # may still change within this mtime tick
+        else:
+            self._stats[key] = [st.st_size, st.st_mtime_ns]
+
+    def _changed(self) -> None:
+        self._dirty = True
+        self._sorted = None
+
+    # ── lookups ──
+
+    def get(self, skill_dir: str) -> Optional[dict]:
+        """Catalog entry for a folder with a SKILL.md, else None."""
+        entry = self._entries().get(skill_dir)
+        return entry if entry and entry.get("sha256") else None
+
+    def file_sha256(self, skill_dir: str, filename: str) -> Optional[str]:
+        """SHA-256 of an installed file as of the last load/record, else None."""
+        entry = self._entries().get(skill_dir)
+        if not entry:
+            return None
+        if filename == "SKILL.md":
+            return entry.get("sha256")
+        return entry["files"].get(filename, {}).get("sha256")
+
+    def files(self, skill_dir: str) -> list[str]:
+        """Installed .md files of a folder, SKILL.md first."""
+        entry = self._entries().get(skill_dir)
+        if not entry:
+            return []
+        return (["SKILL.md"] if entry.get("sha256") else []) + sorted(entry["files"])
+
+    def find(self, prefix: str) -> list[str]:
+        """Skill folders (with a SKILL.md) whose name starts with prefix."""
+        with self._lock:
+            skills = self._entries()
+            if self._sorted is None:
+                self._sorted = sorted(skills)
+            keys = self._sorted
+        i = bisect.bisect_left(keys, prefix)
+        found = []
+        while i < len(keys) and keys[i].startswith(prefix):
+            if skills.get(keys[i], {}).get("sha256"):
+                found.append(keys[i])
+            i += 1
+        return found
+
+    def load(self) -> dict[str, dict]:
+        """The whole catalog (entries are shared; do not mutate)."""
+        return self._entries()
+
+    # ── updates ──
+
+    def record(
+        self, skill_dir: str, filename: str, content: str, source: Optional[str] = None
+    ) -> None:
+        """Note a file just written to SKILLS_DIR/skill_dir/filename."""
+        info = _catalog_file_info(content)
+        with self._lock:
+            entry = self._entries().setdefault(skill_dir, {"files": {}})
+            if filename == "SKILL.md":
+                meta, _ = parse_frontmatter(content)
+                entry.update(info, name=meta.get("name") or skill_dir,
+                             description=meta.get("description", ""))
+                if source:
+                    entry["source"] = source
+            else:
+                entry["files"][filename] = info
+            self._note_stat(f"{skill_dir}/{filename}")
+            self._changed()
+
+    def forget(self, skill_dir: str, filename: str) -> None:
+        """Note a file removed from SKILLS_DIR/skill_dir."""
+        with self._lock:
+            entry = self._entries().get(skill_dir)
+            if not entry:
+                return
+            self._stats.pop(f"{skill_dir}/{filename}", None)
+            if filename == "SKILL.md":
+                for k in ("name", "description", "source", "sha256", "size", "words"):
+                    entry.pop(k, None)
+            else:
+                entry["files"].pop(filename, None)
+            if not entry.get("sha256") and not entry["files"]:
+                del self._skills[skill_dir]
+            self._changed()
+
+    def save(self) -> None:
+        with self._lock:
+            if self._skills is None or not self._dirty or not SKILLS_DIR.is_dir():
+                return
+            dest = SKILLS_DIR / CATALOG_FILE
+            try:
+                tmp = dest.with_name(f"{dest.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps({"version": 1, "skills": self._skills},
+                                          indent=1, sort_keys=True) + "\n", encoding="utf-8")
+                os.replace(tmp, dest)
+            except OSError as exc:
+                _log(f"    WARNING: cannot write {dest}: {exc}")
+                return
+            _save_state("catalog-stat", self._stats)
+            self._dirty = False
+
+
+_catalog = _SkillCatalog()
+
+
+# ── content-addressed skill store ──────────────────────────────────────────────
+
+_STORE_MAX_AGE = 30 * 86400   # seconds; origins, targets and texts not seen since are dropped
+
+
+def _normalized_sha256(content: str) -> str:
+    """SHA-256 of content with line endings, trailing blanks and outer blank lines normalized."""
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return hashlib.sha256("\n".join(l.rstrip() for l in lines).strip("\n").encode("utf-8")).hexdigest()
+
+
+def _git_blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class _SkillStore:
+    """
+    Content-addressed record of the skill files every source delivered,
+    CACHE_DIR/skill-store.json:
+
+        {"<normalized sha256>": {"origins": {"<origin>": <last seen>},
+                                 "targets": {"<dir>/<file>": <last seen>}}}
+
+    Within a run the first source to install (or find unchanged) a target
+    file claims it (local folders, then GitHub, then skills.txt); different
+    content for the same target is a conflict that is reported once per
+    target rather than installed over it.
+    GitHub blob texts are kept under CACHE_DIR/objects/ by git blob SHA, so
+    a blob already fetched for one repo (a fork, a copied skill) is read
+    from disk when it shows up in another.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._files: Optional[dict[str, dict]] = None
+        self._claims: dict[str, tuple[str, str]] = {}   # target -> (hash, origin), this run
+        self.conflicts: dict[str, str] = {}   # target -> "kept …, ignored …", first report wins
+        self.duplicates = 0      # claims of a target by identical content from another origin
+        self.blobs_reused = 0    # GitHub downloads served from objects/
+
+    def _entries(self) -> dict[str, dict]:   # caller holds the lock
+        if self._files is None:
+            self._files = _load_state("skill-store")
+        return self._files
+
+    @staticmethod
+    def _object_path(blob_sha: str) -> Path:
+        return CACHE_DIR / "objects" / blob_sha[:2] / blob_sha[2:]
+
+    def blob_text(self, blob_sha: Optional[str]) -> Optional[str]:
+        """Text of a git blob stored by an earlier fetch, else None."""
+        if not blob_sha:
+            return None
+        path = self._object_path(blob_sha)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)   # mark as recently used for pruning
+        except (OSError, UnicodeDecodeError):
+            return None
+        if _git_blob_sha(text) != blob_sha:
+            return None
+        with self._lock:
+            self.blobs_reused += 1
+        return text
+
+    def put_blob(self, blob_sha: Optional[str], text: Optional[str]) -> None:
+        """Keep a fetched blob text, if it really is that blob."""
+        if not blob_sha or not text or _git_blob_sha(text) != blob_sha:
+            return
+        path = self._object_path(blob_sha)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            _log(f"    WARNING: cannot store blob {blob_sha[:12]}: {exc}")
+
+    def claimed_by(self, key: str, target: str) -> Optional[str]:
+        """The origin that claimed target this run with content other than key, else None."""
+        with self._lock:
+            prior = self._claims.get(target)
+        return prior[1] if prior and prior[0] != key else None
+
+    def claim(self, key: str, target: str, origin: str) -> Optional[str]:
+        """
+        Record that origin's content (normalized hash key) is what target
+        ("<dir>/<file>") now holds; call it only once the install happened or
+        found the file unchanged.  Returns the origin that already claimed
+        target this run with different content (reported as a conflict), else None.
+        """
+        now = int(time.time())
+        with self._lock:
+            entry = self._entries().setdefault(key, {"origins": {}, "targets": {}})
+            entry["origins"][origin] = now
+            prior = self._claims.setdefault(target, (key, origin))
+            if prior[0] != key:
+                self.conflicts.setdefault(target, f"{target}: kept {prior[1]}, ignored {origin}")
+                return prior[1]
+            if prior[1] != origin:
+                self.duplicates += 1
+            entry["targets"][target] = now
+            return None
+
+    def conflict(self, target: str, kept: str, ignored: str) -> None:
+        """Report a conflict with a copy kept on disk (once per target)."""
+        with self._lock:
+            self.conflicts.setdefault(target, f"{target}: kept {kept}, ignored {ignored}")
+
+    def save(self) -> None:
+        """Write skill-store.json, dropping entries and blob texts unused for _STORE_MAX_AGE."""
+        cutoff = time.time() - _STORE_MAX_AGE
+        with self._lock:
+            if self._files is None:
+                return
+            for key in list(self._files):
+                entry = self._files[key]
+                for field in ("origins", "targets"):
+                    entry[field] = {k: t for k, t in entry[field].items() if t >= cutoff}
+                if not entry["origins"]:
+                    del self._files[key]
+            _save_state("skill-store", self._files)
+        objects = CACHE_DIR / "objects"
+        for path in objects.glob("*/*") if objects.is_dir() else ():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+_skill_store = _SkillStore()
+
+
+# ── full-text search (collect-skills.py search …) ─────────────────────────────
+
+SEARCH_DB = "search-index.sqlite"   # inside CACHE_DIR
+_SEARCH_INDEX_VERSION = 1           # bump to rebuild indexes in an older layout
+
+# BM25F-style field boosts: a term in a skill's name counts three times,
+# in its description or a heading twice, in plain body text once.
+_SEARCH_FIELD_WEIGHTS = {"name": 3.0, "description": 2.0, "heading": 2.0, "body": 1.0}
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+_SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SEARCH_STOPWORDS = frozenset(
+    "an and are as at be by can do for from how if in is it its of on or "
+    "that the this to use used uses using when whenever with you your".split()
+)
+
+
+def _search_tokens(text: str) -> list[str]:
+    return [t for t in _SEARCH_TOKEN_RE.findall(text.lower())
+            if len(t) > 1 and t not in _SEARCH_STOPWORDS]
+
+
+def _search_term_weights(fields: dict[str, str]) -> dict[str, float]:
+    """Weighted term frequencies of one document."""
+    tf: dict[str, float] = {}
+    for field, value in fields.items():
+        weight = _SEARCH_FIELD_WEIGHTS[field]
+        for term, n in Counter(_SEARCH_TOKEN_RE.findall(value.lower())).items():
+            if len(term) > 1 and term not in _SEARCH_STOPWORDS:
+                tf[term] = tf.get(term, 0.0) + n * weight
+    return tf
+
+
+def _search_fields(skill_dir: str, filename: str, content: str) -> tuple[dict[str, str], str]:
+    """Split one skill file into weighted fields; also return a one-line title."""
+    meta, body = parse_frontmatter(content)
+    headings: list[str] = []
+    text: list[str] = []
+    in_fence = False
+    for line in body.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith("#"):
+            headings.append(line.lstrip("#").strip())
+            continue
+        text.append(line)
+    if filename == "SKILL.md":
+        name = meta.get("name") or skill_dir
+    else:
+        name = f"{skill_dir} {Path(filename).stem}"
+    description = meta.get("description", "")
+    title = description or (headings[0] if headings else "")
+    return {
+        "name": name.replace("-", " ").replace("_", " "),
+        "description": description,
+        "heading": "\n".join(headings),
+        "body": "\n".join(text),
+    }, title
+
+
+def _search_db():
+    """Open (creating if needed) the on-disk inverted index in CACHE_DIR."""
+    import sqlite3   # only the search path needs it
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(CACHE_DIR / SEARCH_DB)
+    if db.execute("PRAGMA user_version").fetchone()[0] != _SEARCH_INDEX_VERSION:
+        db.executescript("DROP TABLE IF EXISTS docs; DROP TABLE IF EXISTS doc_terms; "
+                         "DROP TABLE IF EXISTS terms;")
+    db.executescript(f"""
+        CREATE TABLE IF NOT EXISTS docs (
+            id     INTEGER PRIMARY KEY,
+            path   TEXT NOT NULL UNIQUE,   -- <skill dir>/<file>.md
+            sha256 TEXT NOT NULL,          -- from the catalog
+            length REAL NOT NULL,          -- weighted token count
+            title  TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS doc_terms (
+            doc   INTEGER PRIMARY KEY,
+            terms TEXT NOT NULL            -- space-separated, to unlink on removal
+        );
+        CREATE TABLE IF NOT EXISTS terms (
+            term TEXT PRIMARY KEY,
+            docs BLOB NOT NULL,            -- array('q') of doc ids
+            tfs  BLOB NOT NULL,            -- array('d') of weighted term frequencies
+            lens BLOB NOT NULL             -- array('d') of those docs' lengths
+        ) WITHOUT ROWID;
+        PRAGMA user_version = {_SEARCH_INDEX_VERSION};
+    """)
+    return db
+
+
+def _search_postings(row: Optional[tuple]) -> dict[int, tuple[float, float]]:
+    """Decode a terms row into {doc id: (tf, doc length)}."""
+    if not row:
+        return {}
+    docs, tfs, lens = array.array("q"), array.array("d"), array.array("d")
+    docs.frombytes(row[0])
+    tfs.frombytes(row[1])
+    lens.frombytes(row[2])
+    return dict(zip(docs, zip(tfs, lens)))
+
+
+def update_search_index(verbose: bool = False) -> tuple[int, int]:
+    """
+    Bring the index in line with the catalog: (re)index only the files whose
+    SHA-256 differs from the one indexed last time, and drop files that are
+    gone.  Only the posting lists of terms in those files are rewritten.
+    Returns (indexed, removed).
+    """
+    wanted: dict[str, str] = {}
+    for skill_dir, entry in _catalog.load().items():
+        if entry.get("sha256"):
+            wanted[f"{skill_dir}/SKILL.md"] = entry["sha256"]
+        for filename, info in entry.get("files", {}).items():
+            wanted[f"{skill_dir}/{filename}"] = info["sha256"]
+
+    db = _search_db()
+    try:
+        with db:
+            indexed = {path: (doc_id, sha) for doc_id, path, sha
+                       in db.execute("SELECT id, path, sha256 FROM docs")}
+            unlinked: dict[str, set[int]] = {}
+            removed = 0
+            for path, (doc_id, sha) in indexed.items():
+                if wanted.get(path) == sha:
+                    continue
+                row = db.execute("SELECT terms FROM doc_terms WHERE doc = ?", (doc_id,)).fetchone()
+                for term in (row[0].split() if row else ()):
+                    unlinked.setdefault(term, set()).add(doc_id)
+                db.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                db.execute("DELETE FROM doc_terms WHERE doc = ?", (doc_id,))
+                removed += path not in wanted
+
+            linked: dict[str, dict[int, tuple[float, float]]] = {}
+            count = 0
+            for path, sha in wanted.items():
+                if path in indexed and indexed[path][1] == sha:
+                    continue
+                skill_dir, _, filename = path.partition("/")
+                try:
+                    content = (SKILLS_DIR / path).read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                fields, title = _search_fields(skill_dir, filename, content)
+                tf = _search_term_weights(fields)
+                length = sum(tf.values())
+                doc_id = db.execute(
+                    "INSERT INTO docs (path, sha256, length, title) VALUES (?, ?, ?, ?)",
+                    (path, sha, length, title),
+                ).lastrowid
+                db.execute("INSERT INTO doc_terms (doc, terms) VALUES (?, ?)",
+                           (doc_id, " ".join(tf)))
+                for term, n in tf.items():
+                    linked.setdefault(term, {})[doc_id] = (n, length)
+                count += 1
+                if verbose:
+                    _log(f"    indexed {path}")
+
+            # Unlink before linking: a freed doc id may have been reused above.
+            for term in unlinked.keys() | linked.keys():
+                postings = _search_postings(db.execute(
+                    "SELECT docs, tfs, lens FROM terms WHERE term = ?", (term,)).fetchone())
+                for doc_id in unlinked.get(term, ()):
+                    postings.pop(doc_id, None)
+                postings.update(linked.get(term, {}))
+                if postings:
+                    tfs, lens = zip(*postings.values())
+                    db.execute(
+                        "INSERT OR REPLACE INTO terms (term, docs, tfs, lens) VALUES (?, ?, ?, ?)",
+                        (term, array.array("q", postings).tobytes(),
+                         array.array("d", tfs).tobytes(), array.array("d", lens).tobytes()),
+                    )
+                else:
+                    db.execute("DELETE FROM terms WHERE term = ?", (term,))
+    finally:
+        db.close()
+    return count, removed
+
+
+def search_skills(query: str, limit: int = 10) -> list[tuple[float, str, str]]:
+    """BM25-ranked (score, path, title) matches for query, best first."""
+    terms = sorted(set(_search_tokens(query)))
+    if not terms:
+        return []
+    db = _search_db()
+    try:
+        n_docs, avg_len = db.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+        if not n_docs:
+            return []
+        avg_len = avg_len or 1.0
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = _search_postings(db.execute(
+                "SELECT docs, tfs, lens FROM terms WHERE term = ?", (term,)).fetchone())
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, (tf, length) in postings.items():
+                norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_BM25_K1 + 1) / (tf + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+        results = []
+        for doc_id, score in best:
+            path, title = db.execute(
+                "SELECT path, title FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            results.append((score, path, title))
+        return results
+    finally:
+        db.close()
+
+
 # ── install helper ─────────────────────────────────────────────────────────────
 
+# Folders whose entries changed since the last _sync_skill_dirs().  Renames
+# and unlinks only become durable once the directory itself is fsynced; doing
+# that once per skill rather than once per file keeps bulk installs cheap.
+_pending_dir_syncs: set[Path] = set()
+_pending_dir_lock = threading.Lock()
+
+
+def _note_dir_change(folder: Path) -> None:
+    with _pending_dir_lock:
+        _pending_dir_syncs.add(folder)
+
+
+def _sync_skill_dirs() -> None:
+    """fsync every folder touched since the last call (no-op where unsupported)."""
+    with _pending_dir_lock:
+        folders = sorted(_pending_dir_syncs)
+        _pending_dir_syncs.clear()
+    for folder in folders:
+        try:
+            fd = os.open(folder, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            continue   # removed since, or a platform without directory fds
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _write_atomic(dest: Path, content: str) -> None:
+    """Replace dest with content via fsync'd temp file + rename: never half-written."""
+    if not dest.parent.is_dir():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _note_dir_change(dest.parent.parent)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(content)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _note_dir_change(dest.parent)
+
+
+def _remove_skill_file(skill_dir: str, filename: str) -> None:
+    """Delete an installed file (and its folder once empty) and update the catalog."""
+    folder = SKILLS_DIR / skill_dir
+    (folder / filename).unlink(missing_ok=True)
+    _catalog.forget(skill_dir, filename)
+    _note_dir_change(folder)
+    if not _catalog.files(skill_dir):
+        try:
+            folder.rmdir()
+            _note_dir_change(SKILLS_DIR)
+        except OSError:
+            pass
+
+
 def install_skill(
     content: str,
     skill_dir: str,
@@ -288,54 +1851,72 @@ def install_skill(
     verbose: bool,
     force: bool,
     filename: str = "SKILL.md",
+    source: Optional[str] = None,
 ) -> str:
-    """Write skill file and return status: 'created' | 'updated' | 'unchanged' | 'skipped' | 'dry-run'."""
+    """
+    Write skill file and return status: 'created' | 'updated' | 'unchanged' |
+    'skipped' | 'conflict' | 'dry-run'.
+    The existing file is compared by its SHA-256 in the catalog, so unchanged
+    skills cost no reads or writes.  Written files are recorded in the catalog,
+    with `source` for SKILL.md.  A target that another source already filled
+    with different content during this run is left alone ('conflict').
+    """
     dest = SKILLS_DIR / skill_dir / filename
     label = f"{skill_dir}/{filename}"
-    if dest.exists():
-        if dest.read_text(encoding="utf-8") == content:
+    key, origin = _normalized_sha256(content), source or label
+    owner = _skill_store.claimed_by(key, label)
+    if owner:
+        _log(f"    CONFLICT: {label} already installed from {owner} this run; "
+              f"not replacing it with {source or 'this copy'}")
+        _skill_store.conflict(label, owner, origin)
+        return "conflict"
+    existing = _catalog.file_sha256(skill_dir, filename)
+    if existing is not None:
+        if existing == hashlib.sha256(content.encode("utf-8")).hexdigest():
+            _skill_store.claim(key, label, origin)
             return "unchanged"
         if not force:
+            installed_from = (_catalog.get(skill_dir) or {}).get("source")
+            if filename == "SKILL.md" and source and installed_from and installed_from != source:
+                _log(f"    CONFLICT: {label} was installed from {installed_from}; "
+                      f"{source} differs (use --force to replace)")
+                _skill_store.conflict(label, installed_from, source)
+                return "conflict"
             if verbose:
-                print(f"    (skip — {label} exists and differs; use --force to replace)")
+                _log(f"    (skip — {label} exists and differs; use --force to replace)")
             return "skipped"
+    # Claimed only now, when the target really gets this content: a
+    # skipped or conflicting copy never owns it.
+    _skill_store.claim(key, label, origin)
     if dry_run:
-        action = "update" if dest.exists() else "create"
-        print(f"    [dry-run] would {action} {dest}")
+        action = "update" if existing else "create"
+        _log(f"    [dry-run] would {action} {dest}")
         return "dry-run"
-    status = "updated" if dest.exists() else "created"
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_text(content, encoding="utf-8")
+    status = "updated" if existing else "created"
+    _write_atomic(dest, content)
+    _catalog.record(skill_dir, filename, content, source)
     if verbose:
-        print(f"    -> {status}: {dest}")
+        _log(f"    -> {status}: {dest}")
     # When placing a skill as a sub-file (e.g. appmotel/traefik.md), remove
     # the now-redundant standalone directory (e.g. traefik/SKILL.md).
     if filename != "SKILL.md":
-        standalone = SKILLS_DIR / Path(filename).stem / "SKILL.md"
-        if standalone.exists():
-            standalone.unlink()
+        stem = Path(filename).stem
+        if _catalog.file_sha256(stem, "SKILL.md"):
+            _remove_skill_file(stem, "SKILL.md")
             if verbose:
-                print(f"    -> removed standalone {standalone.relative_to(SKILLS_DIR)}")
-            try:
-                standalone.parent.rmdir()
-            except OSError:
-                pass
+                _log(f"    -> removed standalone {stem}/SKILL.md")
     return status
 
 
-def _append_see_also(skill_dir: str, sub_files: list[str]) -> None:
-    """Add a ## See Also section to skill_dir/SKILL.md if not already present."""
-    skill_file = SKILLS_DIR / skill_dir / "SKILL.md"
-    if not skill_file.exists():
-        return
-    content = skill_file.read_text(encoding="utf-8")
-    if "## See Also" in content:
-        return
+def _with_see_also(content: str, sub_files: list[str]) -> str:
+    """content plus a ## See Also section linking sub_files, unless it has one."""
+    if not sub_files or "## See Also" in content:
+        return content
     links = "\n".join(
         f"- [{f.removesuffix('.md').replace('-', ' ').title()}]({f})"
         for f in sorted(sub_files)
     )
-    skill_file.write_text(content.rstrip() + f"\n\n## See Also\n\n{links}\n", encoding="utf-8")
+    return content.rstrip() + f"\n\n## See Also\n\n{links}\n"
 
 
 def _migrate_flat_skills(dry_run: bool, verbose: bool) -> None:
@@ -345,14 +1926,20 @@ def _migrate_flat_skills(dry_run: bool, verbose: bool) -> None:
         dest = SKILLS_DIR / skill_name / "SKILL.md"
         if dest.exists():
             if verbose:
-                print(f"  [migrate] {md.name} already at {skill_name}/SKILL.md — removing flat file")
+                _log(f"  [migrate] {md.name} already at {skill_name}/SKILL.md — removing flat file")
             if not dry_run:
                 md.unlink()
+                _note_dir_change(SKILLS_DIR)
             continue
-        print(f"  [migrate] {md.name} -> {skill_name}/SKILL.md")
+        _log(f"  [migrate] {md.name} -> {skill_name}/SKILL.md")
         if not dry_run:
             dest.parent.mkdir(exist_ok=True)
             md.rename(dest)
+            _note_dir_change(SKILLS_DIR)
+            _note_dir_change(dest.parent)
+            _catalog.record(skill_name, "SKILL.md", dest.read_text(encoding="utf-8"),
+                            source="migrated")
+    _sync_skill_dirs()
 
 
 # ── Source 1: local subfolders ─────────────────────────────────────────────────
@@ -360,9 +1947,22 @@ def _migrate_flat_skills(dry_run: bool, verbose: bool) -> None:
 _SOURCE_EXTS = {".md", ".pdf", ".txt", ".rst"}
 
 
-def _tree_md5(folder: Path) -> str:
-    """Compute a single MD5 over all source files (pdf, md, txt, rst) in a folder tree."""
-    h = hashlib.md5()
+# Per-folder manifests in CACHE_DIR/trees/<folder>.json map each source file's
+# relative path to its (size, mtime_ns, inode) and BLAKE2b digest, so only
+# files whose stat changed are re-read.  Folder digests are memoized per run.
+_tree_digests: dict[Path, str] = {}
+_tree_migrated: dict[Path, Optional[str]] = {}
+
+# Files modified this recently may still change within the same mtime tick;
+# their stat is not trusted on the next run ("racy" entries are re-hashed).
+_RACY_MTIME_NS = 2_000_000_000
+
+_HASH_CHUNK = 1 << 20   # 1 MiB read buffer — bounded memory for huge PDFs
+
+
+def _tree_source_files(folder: Path) -> list[Path]:
+    """Source files (pdf, md, txt, rst) in a folder tree, in deterministic order."""
+    files = []
     for f in sorted(folder.rglob("*")):
         if not f.is_file():
             continue
@@ -370,24 +1970,117 @@ def _tree_md5(folder: Path) -> str:
             continue
         if ":Zone.Identifier" in f.name or ":sec.endpointdlp" in f.name:
             continue
-        # Hash the relative path + file contents for determinism
+        files.append(f)
+    return files
+
+
+def _stream_file(path: Path, h) -> None:
+    """Feed a file through hash object h in fixed-size chunks."""
+    buf = bytearray(_HASH_CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as fh:
+        while True:
+            n = fh.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+
+
+def _file_b2(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=32)
+    _stream_file(path, h)
+    return h.hexdigest()
+
+
+def _tree_digest(folder: Path) -> str:
+    """Compute a single BLAKE2b over all source files in a folder tree (incremental, memoized)."""
+    if folder in _tree_digests:
+        return _tree_digests[folder]
+    manifest_file = CACHE_DIR / "trees" / f"{folder.name}.json"
+    try:
+        old = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        old = {}
+    now_ns = time.time_ns()
+    files = _tree_source_files(folder)
+    stats = {str(f.relative_to(folder)): f.stat() for f in files}
+    digests: dict[str, str] = {}
+    stale: list[Path] = []
+    for f in files:
+        rel = str(f.relative_to(folder))
+        st = stats[rel]
+        entry = old.get(rel)
+        if entry and entry.get("b2") and entry.get("stat") == [st.st_size, st.st_mtime_ns, st.st_ino]:
+            digests[rel] = entry["b2"]
+        else:
+            stale.append(f)
+    # hashlib releases the GIL on large updates, so threads use every core
+    for f, digest in zip(stale, _parallel_map(_file_b2, stale, os.cpu_count() or 1)):
+        digests[str(f.relative_to(folder))] = digest
+
+    manifest: dict[str, dict] = {}
+    h = hashlib.blake2b(digest_size=32)
+    for rel, digest in digests.items():   # insertion order == sorted file order
+        st = stats[rel]
+        racy = now_ns - st.st_mtime_ns < _RACY_MTIME_NS
+        manifest[rel] = {
+            "stat": None if racy else [st.st_size, st.st_mtime_ns, st.st_ino],
+            "b2": digest,
+        }
+        h.update(f"{rel}\0{digest}\n".encode())
+    if manifest != old:
+        try:
+            manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = manifest_file.with_name(manifest_file.name + ".tmp")
+            tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+            os.replace(tmp, manifest_file)
+        except OSError as exc:
+            _log(f"    WARNING: cannot write tree manifest for {folder.name}: {exc}")
+    _tree_digests[folder] = h.hexdigest()
+    return _tree_digests[folder]
+
+
+def _md5_tree_digest(folder: Path) -> str:
+    """The original tree.md5sum digest: MD5 over each file's path + raw contents."""
+    h = hashlib.md5()
+    for f in _tree_source_files(folder):
         h.update(str(f.relative_to(folder)).encode())
-        h.update(f.read_bytes())
+        _stream_file(f, h)
     return h.hexdigest()
 
 
-def _tree_changed(folder: Path, verbose: bool) -> bool:
-    """Return True if source files changed since last run (compares tree.md5sum)."""
+def _stored_tree_digest(folder: Path) -> Optional[str]:
+    """
+    Return the digest recorded in folder/tree.b2sum, or None.
+
+    A folder that only has an older tree.md5sum is migrated transparently:
+    the MD5 file is read once and, if it still matches the sources, the
+    current BLAKE2b digest is reported so upgrading does not regenerate.
+    """
+    b2_file = folder / "tree.b2sum"
+    if b2_file.exists():
+        return b2_file.read_text(encoding="utf-8").strip()
     md5_file = folder / "tree.md5sum"
-    current = _tree_md5(folder)
-    if md5_file.exists():
+    if not md5_file.exists():
+        return None
+    if folder not in _tree_migrated:
         stored = md5_file.read_text(encoding="utf-8").strip()
-        if stored == current:
-            if verbose:
-                print(f"    {folder.name}/tree.md5sum unchanged")
-            return False
-    md5_file.write_text(current + "\n", encoding="utf-8")
-    return True
+        matches = stored == _md5_tree_digest(folder)
+        _tree_migrated[folder] = _tree_digest(folder) if matches else stored
+    return _tree_migrated[folder]
+
+
+def _tree_changed(folder: Path, verbose: bool) -> bool:
+    """Return True if source files changed since last run (compares tree.b2sum)."""
+    b2_file = folder / "tree.b2sum"
+    current = _tree_digest(folder)
+    changed = _stored_tree_digest(folder) != current
+    if not changed and verbose:
+        _log(f"    {folder.name}/tree.b2sum unchanged")
+    if changed or not b2_file.exists():
+        b2_file.write_text(current + "\n", encoding="utf-8")
+    (folder / "tree.md5sum").unlink(missing_ok=True)
+    return changed
 
 
 def _source_tag(item: Path) -> str:
@@ -415,238 +2108,341 @@ def _install_bundle(
     src_label: str,
     dry_run: bool,
     verbose: bool,
+    report: Optional[SkillReport] = None,
 ) -> bool:
     """
     Write all files in a skill bundle to .claude/skills/<skill_dir>/.
-    SKILL.md is validated; sub-files are written unconditionally.
-    Returns True if SKILL.md was successfully installed.
+    SKILL.md is validated (unless its report is passed in); sub-files are
+    written unconditionally.  Returns True if SKILL.md was successfully installed.
     """
     skill_md = bundle.get("SKILL.md", "")
-    reason = _skill_rejection_reason(skill_md)
+    report = report or validate_skill(skill_md)
+    reason = report.reason()
     if reason:
-        print(f"    WARNING: generated SKILL.md invalid: {reason}")
+        _log(f"    WARNING: generated SKILL.md invalid: {reason}")
         # Show first 120 chars of what we got
-        print(f"    Content preview: {skill_md[:120]!r}")
+        _log(f"    Content preview: {skill_md[:120]!r}")
         return False
 
-    meta, _ = parse_frontmatter(skill_md)
-    sdir = skill_dirname(meta, folder_name)
-
-    # Write SKILL.md (always overwrite — we just generated it from changed sources)
-    st = install_skill(skill_md, sdir, dry_run, verbose, force=True)
-    n_sub = len(bundle) - 1
-    print(f"  [local+AI] {folder_name}/{src_label} -> {sdir}/SKILL.md  [{st}]"
-          + (f"  (+{n_sub} sub-files)" if n_sub else ""))
-
-    # Write sub-files
-    for filename, content in bundle.items():
-        if filename == "SKILL.md":
-            continue
-        st_sub = install_skill(content, sdir, dry_run, verbose, force=True,
-                               filename=filename)
+    _print_skill_warnings(report, f"{folder_name}/SKILL.md (generated)", verbose)
+    sdir = skill_dirname(report.meta, folder_name)
+
+    # Sub-files first and SKILL.md last, so an interrupted install never
+    # leaves a SKILL.md whose links point at files that are not there yet.
+    # Always overwrite — we just generated them from changed sources.
+    source = f"local+AI:{folder_name}"
+    sub_status = [
+        (filename, install_skill(content, sdir, dry_run, verbose, force=True,
+                                 filename=filename, source=f"{source}/{filename}"))
+        for filename, content in bundle.items() if filename != "SKILL.md"
+    ]
+    st = install_skill(skill_md, sdir, dry_run, verbose, force=True, source=source)
+    _log(f"  [local+AI] {folder_name}/{src_label} -> {sdir}/SKILL.md  [{st}]"
+          + (f"  (+{len(sub_status)} sub-files)" if sub_status else ""))
+    for filename, st_sub in sub_status:
         if verbose or st_sub not in ("unchanged",):
-            print(f"    [local+AI] {sdir}/{filename}  [{st_sub}]")
+            _log(f"    [local+AI] {sdir}/{filename}  [{st_sub}]")
 
-    # Remove any .md files in the skill dir that are not in the new bundle
-    skill_dir_path = SKILLS_DIR / sdir
-    new_files = set(bundle.keys())
-    for old_file in sorted(skill_dir_path.glob("*.md")):
-        if old_file.name not in new_files:
+    # Remove any .md files the catalog lists for the skill dir that are not
+    # in the new bundle
+    for old_file in _catalog.files(sdir):
+        if old_file not in bundle:
             if dry_run:
-                print(f"    [dry-run] would remove orphan {sdir}/{old_file.name}")
+                _log(f"    [dry-run] would remove orphan {sdir}/{old_file}")
             else:
-                old_file.unlink()
-                print(f"    [local+AI] removed orphan {sdir}/{old_file.name}")
+                _remove_skill_file(sdir, old_file)
+                _log(f"    [local+AI] removed orphan {sdir}/{old_file}")
 
+    _sync_skill_dirs()
     return True
 
 
-def collect_local(dry_run: bool, verbose: bool, generate: bool, force: bool) -> None:
+@_traced("phase")
+def collect_local(
+    dry_run: bool, verbose: bool, generate: bool, force: bool, gen_jobs: int = 1,
+    batch: bool = False, batch_wait: Optional[float] = None,
+) -> None:
     subfolders = [
         i for i in sorted(REPO_ROOT.iterdir())
         if i.is_dir() and not i.name.startswith(".") and i.name not in _SKIP_DIRS
     ]
-    print(f"\n=== Source 1: local subfolders ({len(subfolders)} found) ===")
+    _log(f"\n=== Source 1: local subfolders ({len(subfolders)} found) ===")
+    # Catalog prefix lookup — also matches e.g. aws-sdk-go-v2 for folder aws-sdk-go
+    on_disk = {item: bool(_catalog.find(sanitize_name(item.name))) for item in subfolders}
     for item in subfolders:
         skill_name = sanitize_name(item.name)
-        # Also match e.g. aws-sdk-go-v2 for folder aws-sdk-go
-        skill_exists = any(
-            (SKILLS_DIR / d.name / "SKILL.md").exists()
-            for d in [SKILLS_DIR / skill_name]
-            + list(SKILLS_DIR.glob(f"{skill_name}*"))
-        )
+        skill_exists = on_disk[item]
         tag = _source_tag(item)
         status_str = "skill on disk" if skill_exists else "skill missing"
         # Peek at stored checksum to show change status
-        md5_file = item / "tree.md5sum"
-        if md5_file.exists():
-            stored = md5_file.read_text(encoding="utf-8").strip()
-            current = _tree_md5(item)
+        stored = _stored_tree_digest(item)
+        if stored is not None:
+            current = _tree_digest(item)
             src_status = "sources changed" if stored != current else "sources unchanged"
         else:
             src_status = "no checksum yet"
-        print(f"  {item.name}/  →  {skill_name}/SKILL.md  [{tag}]  [{status_str}]  [{src_status}]")
+        _log(f"  {item.name}/  →  {skill_name}/SKILL.md  [{tag}]  [{status_str}]  [{src_status}]")
 
     # ── now process each subfolder ──
-    for item in subfolders:
-        skill_name = sanitize_name(item.name)
-        installed = False
+    # Existing skill files install immediately; AI generations run on a pool
+    # of gen_jobs workers (CLI/SDK calls are further capped by _cli_slots /
+    # _sdk_slots) and their bundles are installed below, one at a time in
+    # folder order — so after every folder's ready-made SKILL.md, not
+    # interleaved with them as in a sequential run.
+    with ThreadPoolExecutor(max_workers=max(1, gen_jobs)) as pool:
+        jobs: list[tuple[Path, Future]] = []
+        batched: list[Path] = []
+        for item in subfolders:
+            skill_name = sanitize_name(item.name)
+            installed = False
+
+            skill_on_disk = on_disk[item]
+
+            # Compute tree checksum to detect source changes
+            changed = _tree_changed(item, verbose) if not dry_run else True
+
+            # 1-a  explicit SKILL.md  (official format used by claude.ai)
+            for candidate in (item / "SKILL.md", item / "skill.md"):
+                if candidate.exists():
+                    content = candidate.read_text(encoding="utf-8")
+                    report = validate_skill(content)
+                    if report.ok:
+                        _print_skill_warnings(report, f"{item.name}/{candidate.name}", verbose)
+                        sdir = skill_dirname(report.meta, item.name)
+                        st = install_skill(content, sdir, dry_run, verbose, force,
+                                           source=f"local:{item.name}/{candidate.name}")
+                        _log(f"  [local] {item.name}/{candidate.name} -> {sdir}/SKILL.md  [{st}]")
+                        installed = True
+                        break
 
-        # Check if skill already exists on disk (also match e.g. aws-sdk-go-v2)
-        skill_on_disk = any(
-            (SKILLS_DIR / d.name / "SKILL.md").exists()
-            for d in [SKILLS_DIR / skill_name]
-            + list(SKILLS_DIR.glob(f"{skill_name}*"))
-        )
+            # 1-b  any *.md with valid YAML frontmatter
+            if not installed:
+                for md in sorted(item.glob("*.md")):
+                    if md.name.upper() == "README.MD":
+                        continue  # skip plain READMEs unless they have frontmatter
+                    content = md.read_text(encoding="utf-8", errors="replace")
+                    report = validate_skill(content)
+                    if report.ok:
+                        _print_skill_warnings(report, f"{item.name}/{md.name}", verbose)
+                        sdir = skill_dirname(report.meta, item.name)
+                        st = install_skill(content, sdir, dry_run, verbose, force,
+                                           source=f"local:{item.name}/{md.name}")
+                        _log(f"  [local] {item.name}/{md.name} -> {sdir}/SKILL.md  [{st}]")
+                        installed = True
+                        break
 
-        # Compute tree checksum to detect source changes
-        changed = _tree_changed(item, verbose) if not dry_run else True
+            # Skip AI generation if skill exists and source tree is unchanged
+            if not installed and skill_on_disk and not changed and not force:
+                _log(f"  [local] {item.name}/ -> {skill_name}/SKILL.md  [unchanged sources, skip generation]")
+                continue
 
-        # 1-a  explicit SKILL.md  (official format used by claude.ai)
-        for candidate in (item / "SKILL.md", item / "skill.md"):
-            if candidate.exists():
-                content = candidate.read_text(encoding="utf-8")
-                if is_valid_skill(content):
-                    meta, _ = parse_frontmatter(content)
-                    sdir = skill_dirname(meta, item.name)
-                    st = install_skill(content, sdir, dry_run, verbose, force)
-                    print(f"  [local] {item.name}/{candidate.name} -> {sdir}/SKILL.md  [{st}]")
-                    installed = True
-                    break
-
-        # 1-b  any *.md with valid YAML frontmatter
-        if not installed:
-            for md in sorted(item.glob("*.md")):
-                if md.name.upper() == "README.MD":
-                    continue  # skip plain READMEs unless they have frontmatter
-                content = md.read_text(encoding="utf-8", errors="replace")
-                if is_valid_skill(content):
-                    meta, _ = parse_frontmatter(content)
-                    sdir = skill_dirname(meta, item.name)
-                    st = install_skill(content, sdir, dry_run, verbose, force)
-                    print(f"  [local] {item.name}/{md.name} -> {sdir}/SKILL.md  [{st}]")
-                    installed = True
-                    break
-
-        # Skip AI generation if skill exists and source tree is unchanged
-        if not installed and skill_on_disk and not changed and not force:
-            print(f"  [local] {item.name}/ -> {skill_name}/SKILL.md  [unchanged sources, skip generation]")
+            if not installed and generate and _generation_backend():
+                if batch:
+                    batched.append(item)
+                else:
+                    jobs.append((item, pool.submit(_generate_local_bundle, item)))
+            elif not installed and verbose:
+                _log(f"    (nothing usable found in {item.name}/)")
+
+        # ── --batch: one Message Batches submission for every pending folder ──
+        if batched:
+            sources = _parallel_map(_batch_source, batched, gen_jobs)
+            ready = [(item, src) for item, src in zip(batched, sources) if src]
+            for item, src in zip(batched, sources):
+                if not src and verbose:
+                    _log(f"    (nothing usable found in {item.name}/)")
+            bundles = (_generate_batch([(item.name, text) for item, (text, _) in ready], batch_wait)
+                       if ready else [])
+            if bundles is None:   # batching unavailable — generate one by one
+                for item, _ in ready:
+                    jobs.append((item, pool.submit(_generate_local_bundle, item)))
+            else:
+                for (item, (_, src_label)), bundle in zip(ready, bundles):
+                    done: Future = Future()
+                    done.set_result((bundle, src_label, None) if bundle else None)
+                    jobs.append((item, done))
+
+        # ── install generated bundles in folder order as they complete ──
+        for item, future in jobs:
+            result = future.result()
+            installed = False
+            if result:
+                bundle, src_label, report = result
+                installed = _install_bundle(bundle, item.name, src_label, dry_run, verbose, report)
+            if not installed and verbose:
+                _log(f"    (nothing usable found in {item.name}/)")
+
+
+@_traced("folder", lambda item: item.name)
+def _generate_local_bundle(
+    item: Path,
+) -> Optional[tuple[dict[str, str], str, Optional[SkillReport]]]:
+    """
+    Generate a skill bundle for one local subfolder (runs on a worker thread).
+    Returns (bundle, source label, SKILL.md report if already validated) or
+    None; installing is left to the caller.
+    """
+    # 1-c  PDFs
+    #   - claude CLI available: pass pdf_path directly (CLI reads PDFs natively)
+    #   - SDK fallback: extract text first with pymupdf4llm / pypdf / pdftotext
+    claude_bin = _claude_cli()
+    for pdf in sorted(item.rglob("*.pdf")):
+        if pdf.name.endswith(":Zone.Identifier"):
             continue
+        if claude_bin:
+            bundle = _generate_skill_via_claude(None, item.name, pdf_path=pdf)
+        else:
+            text = _extract_pdf_text(pdf)
+            if not text:
+                continue
+            bundle = _generate_skill_via_claude(text, item.name)
+        if bundle:
+            report = validate_skill(bundle.get("SKILL.md", ""))
+            if report.ok:
+                return bundle, pdf.name, report
+            _log(f"    WARNING: SKILL.md generated from {item.name}/{pdf.name} invalid: {report.reason()}")
+
+    # 1-d  Any markdown / text as AI source (README, .pdf.md, etc.)
+    combined, n_parts = _combined_markdown(item)
+    if combined:
+        bundle = _generate_skill_via_claude(combined, item.name)
+        if bundle:
+            return bundle, f"{n_parts} markdown files", None
+    return None
 
-        # 1-c  PDFs
-        #   - claude CLI available: pass pdf_path directly (CLI reads PDFs natively)
-        #   - SDK fallback: extract text first with pymupdf4llm / pypdf / pdftotext
-        if not installed and generate:
-            claude_bin = shutil.which("claude") if not os.environ.get("CLAUDECODE") else None
-            for pdf in sorted(item.rglob("*.pdf")):
-                if pdf.name.endswith(":Zone.Identifier"):
-                    continue
-                if claude_bin:
-                    bundle = _generate_skill_via_claude(None, item.name, pdf_path=pdf)
-                else:
-                    text = _extract_pdf_text(pdf)
-                    if not text:
-                        continue
-                    bundle = _generate_skill_via_claude(text, item.name)
-                if bundle:
-                    installed = _install_bundle(
-                        bundle, item.name, f"{pdf.name}", dry_run, verbose)
-                    if installed:
-                        break
 
-        # 1-d  Any markdown / text as AI source (README, .pdf.md, etc.)
-        #      Concatenate ALL markdown in the tree into ONE generation call.
-        if not installed and generate:
-            parts: list[str] = []
-            for md in sorted(item.rglob("*.md")):
-                if md.name.endswith(":Zone.Identifier"):
-                    continue
-                text = md.read_text(encoding="utf-8", errors="replace").strip()
-                if len(text) < 100:
-                    continue
-                parts.append(f"## File: {md.relative_to(item)}\n\n{text}")
-            combined = "\n\n---\n\n".join(parts)
-            if len(combined) >= 200:
-                bundle = _generate_skill_via_claude(combined, item.name)
-                if bundle:
-                    installed = _install_bundle(
-                        bundle, item.name,
-                        f"{len(parts)} markdown files", dry_run, verbose)
+def _combined_markdown(item: Path) -> tuple[str, int]:
+    """Concatenate ALL markdown in the tree for ONE generation call ("" if too little)."""
+    parts: list[str] = []
+    for md in sorted(item.rglob("*.md")):
+        if md.name.endswith(":Zone.Identifier"):
+            continue
+        text = md.read_text(encoding="utf-8", errors="replace").strip()
+        if len(text) < 100:
+            continue
+        parts.append(f"## File: {md.relative_to(item)}\n\n{text}")
+    combined = "\n\n---\n\n".join(parts)
+    return (combined, len(parts)) if len(combined) >= 200 else ("", 0)
 
-        if not installed and verbose:
-            print(f"    (nothing usable found in {item.name}/)")
 
+def _batch_source(item: Path) -> Optional[tuple[str, str]]:
+    """Text to generate from in --batch mode: (doc_text, source label) or None."""
+    for pdf in sorted(item.rglob("*.pdf")):
+        if pdf.name.endswith(":Zone.Identifier"):
+            continue
+        text = _extract_pdf_text(pdf)
+        if text:
+            return text, pdf.name
+    combined, n_parts = _combined_markdown(item)
+    return (combined, f"{n_parts} markdown files") if combined else None
 
-def _extract_pdf_text(pdf_path: Path) -> Optional[str]:
-    """Try pymupdf4llm → pypdf → pdftotext CLI."""
-    try:
-        import pymupdf4llm  # pip install pymupdf4llm pymupdf-layout
-        return pymupdf4llm.to_markdown(str(pdf_path))
-    except ImportError:
-        pass
-    except Exception as exc:
-        print(f"    WARNING: pymupdf4llm failed on {pdf_path.name}: {exc}")
 
-    try:
-        from pypdf import PdfReader  # pip install pypdf
-        reader = PdfReader(str(pdf_path))
-        return "\n\n".join(page.extract_text() or "" for page in reader.pages)
-    except ImportError:
-        pass
-    except Exception as exc:
-        print(f"    WARNING: pypdf failed on {pdf_path.name}: {exc}")
+_pdf_extractor_list: Optional[list[tuple[str, str]]] = None
 
-    try:
-        result = subprocess.run(
-            ["pdftotext", str(pdf_path), "-"],
-            capture_output=True, text=True, timeout=30,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        pass
 
-    print(
-        f"    WARNING: cannot extract text from {pdf_path.name}.\n"
-        f"             Install one of: pymupdf4llm, pypdf, or poppler-utils (pdftotext)."
-    )
+def _pdf_extractors() -> list[tuple[str, str]]:
+    """Installed PDF extractors as (name, version), in preference order (probed once)."""
+    global _pdf_extractor_list
+    if _pdf_extractor_list is None:
+        import importlib.metadata
+        found: list[tuple[str, str]] = []
+        for name in ("pymupdf4llm", "pypdf"):
+            if importlib.util.find_spec(name) is None:
+                continue
+            try:
+                found.append((name, importlib.metadata.version(name)))
+            except importlib.metadata.PackageNotFoundError:
+                found.append((name, "unknown"))
+        if shutil.which("pdftotext"):
+            try:
+                out = subprocess.run(["pdftotext", "-v"], capture_output=True,
+                                     text=True, timeout=10)
+                m = re.search(r"version\s+(\S+)", out.stderr + out.stdout)
+                found.append(("pdftotext", m.group(1) if m else "unknown"))
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        _pdf_extractor_list = found
+    return _pdf_extractor_list
+
+
+def _run_pdf_extractor(name: str, pdf_path: Path) -> Optional[str]:
+    if name == "pymupdf4llm":
+        try:
+            import pymupdf4llm  # pip install pymupdf4llm pymupdf-layout
+            return pymupdf4llm.to_markdown(str(pdf_path))
+        except Exception as exc:
+            _log(f"    WARNING: pymupdf4llm failed on {pdf_path.name}: {exc}")
+    elif name == "pypdf":
+        try:
+            from pypdf import PdfReader  # pip install pypdf
+            reader = PdfReader(str(pdf_path))
+            return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+        except Exception as exc:
+            _log(f"    WARNING: pypdf failed on {pdf_path.name}: {exc}")
+    elif name == "pdftotext":
+        try:
+            result = subprocess.run(
+                ["pdftotext", str(pdf_path), "-"],
+                capture_output=True, text=True, timeout=30,
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            pass
     return None
 
 
-def _generate_skill_via_claude(
-    doc_text: Optional[str],
-    folder_name: str,
-    pdf_path: Optional[Path] = None,
-) -> Optional[dict[str, str]]:
+@_traced("pdf", lambda pdf_path: f"{pdf_path.parent.name}/{pdf_path.name}")
+def _extract_pdf_text(pdf_path: Path) -> Optional[str]:
     """
-    Generate a skill file from documentation.
-
-    Primary path  — `claude` CLI in batch mode (`-p` flag):
-      Uses the first `claude` found in PATH, which may be a ~/bin wrapper that
-      configures AWS Bedrock credentials.  When pdf_path is supplied the CLI reads
-      the PDF natively via its built-in Read tool — no extraction library needed.
+    Try pymupdf4llm → pypdf → pdftotext CLI.
 
-    Fallback path — Anthropic Python SDK:
-      Used when `claude` is not in PATH (e.g. GitHub Actions).
-      Requires ANTHROPIC_API_KEY and extracted doc_text.
+    Output is cached in CACHE_DIR/pdf-text/ keyed by the PDF's content hash
+    and the extractor's name and version, so a cache hit skips extraction.
     """
-    skill_name = sanitize_name(folder_name)
+    digest = None
+    for name, version in _pdf_extractors():
+        if digest is None:
+            digest = _file_b2(pdf_path)
+        cache_file = CACHE_DIR / "pdf-text" / f"{digest}.{name}-{version}.md"
+        try:
+            return cache_file.read_text(encoding="utf-8")
+        except OSError:
+            pass
+        text = _run_pdf_extractor(name, pdf_path)
+        if text is None:
+            continue
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, cache_file)
+        except OSError as exc:
+            _log(f"    WARNING: cannot cache extracted text for {pdf_path.name}: {exc}")
+        return text
+
+    _log(
+        f"    WARNING: cannot extract text from {pdf_path.name}.\n"
+        f"             Install one of: pymupdf4llm, pypdf, or poppler-utils (pdftotext)."
+    )
+    return None
 
-    large = doc_text is not None and len(doc_text) >= _LARGE_CONTENT_THRESHOLD
 
-    if large:
-        instructions = f"""IMPORTANT: Print ONLY the raw file output below — no preamble, no commentary.
+# Generation instructions.  They never mention the skill name (it is given in
+# the request), so guide + instructions form a byte-identical prompt prefix
+# that the API can serve from its prompt cache across skills.
+_MULTI_FILE_INSTRUCTIONS = """IMPORTANT: Print ONLY the raw file output below — no preamble, no commentary.
 Do NOT use the Write, Edit, or Bash tools. You may use Read to access source docs.
 
 OUTPUT FORMAT — use this exact multi-file delimiter for each file:
 <<<FILE: SKILL.md>>>
 ---
-name: {skill_name}
+name: <the exact skill name given in the request>
 description: <verbose trigger phrase, see DESCRIPTION RULES>
 ---
 
 ## Overview
-One-paragraph summary of what {skill_name} is.
+One-paragraph summary of what the skill covers.
 
 ## Topics
 - [Setup](setup.md) — installation and configuration
@@ -670,143 +2466,631 @@ RULES:
 - NO XML angle brackets anywhere (outside code fences)
 - Every code block must have a language tag
 
-DESCRIPTION RULES for SKILL.md:
-- Start with "Use this skill whenever the user wants to..."
-- Exhaustively list every task, concept, command, file type the skill covers
-- Aim for 3-6 sentences / 400-900 characters"""
-    else:
-        instructions = f"""IMPORTANT: Print the skill file content to stdout ONLY.
-Do NOT write or create any files. Do NOT use the Write, Edit, or Bash tools.
-You may use the Read tool to read source documents, but your final output must be
-ONLY the raw skill file content printed to stdout.
-No preamble, no commentary, no explanation — just the content starting with ---
+DESCRIPTION RULES for SKILL.md:
+- Start with "Use this skill whenever the user wants to..."
+- Exhaustively list every task, concept, command, file type the skill covers
+- Aim for 3-6 sentences / 400-900 characters"""
+
+_SINGLE_FILE_INSTRUCTIONS = """IMPORTANT: Print the skill file content to stdout ONLY.
+Do NOT write or create any files. Do NOT use the Write, Edit, or Bash tools.
+You may use the Read tool to read source documents, but your final output must be
+ONLY the raw skill file content printed to stdout.
+No preamble, no commentary, no explanation — just the content starting with ---
+
+STRICT FORMAT RULES:
+1. First line must be exactly:  ---
+2. Then:  name: <the exact skill name given in the request>
+3. Then a verbose description field (see DESCRIPTION RULES below)
+4. Then:  ---
+5. Then the Markdown body
+
+DESCRIPTION RULES — model the official Anthropic style exactly:
+- Start with "Use this skill whenever the user wants to..."
+- Exhaustively list EVERY task, sub-task, file extension, command, API, concept, and
+  natural-language phrase that should trigger this skill.
+- Include what NOT to use it for if relevant ("Do NOT use for simple X").
+- Aim for 3-6 sentences / 400-900 characters.  No XML angle brackets anywhere.
+
+BODY RULES:
+- Sections: ## Setup, ## Quick Start, ## Examples, ## Key Concepts, ## References
+- Every code example must use a fenced block with a language tag (python, bash, go, etc.)
+- NO XML tags anywhere (no angle brackets outside code fences) — security requirement
+- Keep the total file under 5 000 words
+- ## References: link to every official doc URL mentioned in the source material"""
+
+
+def _print_usage(backend: str, usage) -> None:
+    """Report token usage for one generation, including prompt-cache hits."""
+    def n(field: str) -> int:
+        return getattr(usage, field, None) or 0
+    _log(f"    {backend} tokens: input={n('input_tokens')} "
+          f"cache_write={n('cache_creation_input_tokens')} "
+          f"cache_read={n('cache_read_input_tokens')} output={n('output_tokens')}")
+
+
+def _claude_cli() -> Optional[str]:
+    """Path of the claude CLI, or None (also None inside a Claude Code session)."""
+    # Skip CLI when running inside an existing Claude Code session (nesting crashes)
+    return shutil.which("claude") if not os.environ.get("CLAUDECODE") else None
+
+
+def _run_claude_cli(claude_bin: str, prompt: str, label: str = "") -> Optional[str]:
+    """Run `claude -p` under the CLI concurrency cap; return stdout or None."""
+    try:
+        with _cli_slots, _metrics.span("model", label or "claude -p", backend="claude CLI"):
+            started = time.perf_counter()
+            # The prompt goes in on stdin: as one argv string, non-ASCII text
+            # can pass the kernel's 128 KiB per-argument limit (E2BIG).
+            result = subprocess.run(
+                [claude_bin, "-p", "--output-format", "text"],
+                input=prompt, capture_output=True, text=True, timeout=120,
+            )
+        _metrics.model_call(label, "claude CLI", time.perf_counter() - started,
+                            prompt_chars=len(prompt), output_chars=len(result.stdout))
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout
+        _log(f"    WARNING: claude CLI non-zero exit: {result.stderr[:200]}")
+    except Exception as exc:
+        _log(f"    WARNING: claude CLI error: {exc}")
+    return None
+
+
+_generation_backend_cache: Optional[tuple] = None
+
+
+def _generation_backend() -> Optional[str]:
+    """
+    Describe the backend AI generation will use, or None if there is none.
+    Probed (and announced) the first time a folder needs generation, so
+    runs that generate nothing never look for the CLI or import the SDK.
+    """
+    global _generation_backend_cache
+    with _sdk_client_lock:
+        if _generation_backend_cache is None:
+            with _metrics.span("startup", "backend probe"):
+                claude_bin = _claude_cli()
+                if claude_bin:
+                    backend = f"claude CLI: {claude_bin}"
+                elif os.environ.get("ANTHROPIC_API_KEY"):
+                    backend = "Anthropic SDK, ANTHROPIC_API_KEY set"
+                else:
+                    try:
+                        import anthropic
+                        backend = "AWS Bedrock SDK" if hasattr(anthropic, "AnthropicBedrock") else None
+                    except ImportError:
+                        backend = None
+            _generation_backend_cache = (backend,)
+            if backend:
+                _log(f"  AI generation: ON  ({backend})")
+            else:
+                _log("  AI generation: OFF  (no 'claude' in PATH and ANTHROPIC_API_KEY not set)")
+    return _generation_backend_cache[0]
+
+
+_sdk_client_cache: Optional[tuple] = None
+_sdk_client_lock = threading.Lock()
+
+
+def _sdk_client():
+    """Return (client, backend label, use_bedrock) for the SDK fallback, or None (cached)."""
+    global _sdk_client_cache
+    with _sdk_client_lock:
+        if _sdk_client_cache is None:
+            _sdk_client_cache = (_make_sdk_client(),)
+    return _sdk_client_cache[0]
+
+
+def _make_sdk_client():
+    try:
+        import anthropic  # pip install anthropic  (or pip install 'anthropic[bedrock]')
+    except ImportError:
+        _log("    WARNING: 'anthropic' package not installed. Run: pip install anthropic")
+        return None
+
+    # Pick the right client: Bedrock when AWS credentials are present, else direct API
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    use_bedrock = not api_key and hasattr(anthropic, "AnthropicBedrock")
+    if not api_key and not use_bedrock:
+        _log("    WARNING: ANTHROPIC_API_KEY not set and Bedrock not available.")
+        return None
+    if use_bedrock:
+        region = os.environ.get("AWS_DEFAULT_REGION", "us-west-2")
+        profile = os.environ.get("AWS_PROFILE", "bedrock")
+        client = anthropic.AnthropicBedrock(aws_region=region, aws_profile=profile)
+        return client, "Bedrock", True
+    return anthropic.Anthropic(api_key=api_key), "Anthropic SDK", False
+
+
+def _sdk_model(use_bedrock: bool, large: bool) -> tuple[str, int]:
+    """Return (model, max_tokens) for a small or large SDK request."""
+    if use_bedrock:
+        if large:
+            return os.environ.get("BEDROCK_LARGE_MODEL", _LARGE_BEDROCK_MODEL), 65536
+        return os.environ.get("BEDROCK_MODEL",
+                              "us.anthropic.claude-haiku-4-5-20251001-v1:0"), 4096
+    if large:
+        return os.environ.get("SDK_LARGE_MODEL", _LARGE_SDK_MODEL), 65536
+    return os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-6"), 4096
+
+
+def _run_sdk(
+    system: list[dict], user_prompt: str, large: bool, max_tokens: Optional[int] = None,
+    label: str = "",
+) -> Optional[str]:
+    """One SDK/Bedrock request under the SDK concurrency cap; return the text or None."""
+    sdk = _sdk_client()
+    if sdk is None:
+        return None
+    client, backend, use_bedrock = sdk
+    model, default_max = _sdk_model(use_bedrock, large)
+    params = dict(
+        model=model,
+        max_tokens=max_tokens or default_max,
+        system=system,
+        messages=[{"role": "user", "content": user_prompt}],
+    )
+    try:
+        with _sdk_slots, _metrics.span("model", label or model, backend=backend) as info:
+            started = time.perf_counter()
+            if large:
+                # Large requests can exceed 10 min; streaming is required
+                with client.messages.stream(**params) as stream:
+                    msg = stream.get_final_message()
+            else:
+                msg = client.messages.create(**params)
+            info.update(input_tokens=getattr(msg.usage, "input_tokens", None),
+                        output_tokens=getattr(msg.usage, "output_tokens", None))
+    except Exception as exc:
+        _log(f"    WARNING: {backend} error: {exc}")
+        return None
+    _print_usage(backend, msg.usage)
+    text = "".join(b.text for b in msg.content if getattr(b, "type", "") == "text")
+    _metrics.model_call(label, backend, time.perf_counter() - started, msg.usage,
+                        prompt_chars=len(user_prompt), output_chars=len(text))
+    return text
+
+
+_USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def _stream_sdk(
+    system: list[dict], user_prompt: str, on_text: Callable[[str], None], label: str = "",
+) -> bool:
+    """
+    One large SDK/Bedrock request, streamed under the SDK concurrency cap.
+    on_text sees each text delta as it arrives; the reply is never joined, so
+    only what on_text keeps stays in memory.  True once the stream completes,
+    False on failure.  _BundleRejected from on_text ends the stream and is
+    raised to the caller.
+    """
+    sdk = _sdk_client()
+    if sdk is None:
+        return False
+    client, backend, use_bedrock = sdk
+    model, max_tokens = _sdk_model(use_bedrock, True)
+    usage = types.SimpleNamespace(output_tokens=None, **dict.fromkeys(_USAGE_FIELDS))
+    output_chars = 0
+    try:
+        with _sdk_slots, _metrics.span("model", label or model, backend=backend) as info:
+            started = time.perf_counter()
+            # Raw events: the SDK's message stream would accumulate the reply too
+            with client.messages.create(
+                model=model, max_tokens=max_tokens, system=system,
+                messages=[{"role": "user", "content": user_prompt}], stream=True,
+            ) as events:
+                for event in events:
+                    if event.type == "message_start":
+                        for field in _USAGE_FIELDS:
+                            setattr(usage, field, getattr(event.message.usage, field, None))
+                    elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                        output_chars += len(event.delta.text)
+                        on_text(event.delta.text)
+                    elif event.type == "message_delta":
+                        usage.output_tokens = event.usage.output_tokens
+            info.update(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+    except _BundleRejected:
+        raise
+    except Exception as exc:
+        _log(f"    WARNING: {backend} error: {exc}")
+        return False
+    _print_usage(backend, usage)
+    _metrics.model_call(label, backend, time.perf_counter() - started, usage,
+                        prompt_chars=len(user_prompt), output_chars=output_chars)
+    return True
+
+
+# ── map-reduce for oversized sources ──────────────────────────────────────────
+
+# Sources longer than the inline budget of the chosen backend are split on
+# markdown headings into chunks, condensed in parallel (map), and the joined
+# notes are turned into a multi-file bundle (reduce).  Budgets are characters
+# (~4 per token).
+_CHUNK_CHARS       = 60_000    # ≈15k tokens per condense call
+_CLI_INLINE_CHARS  = 60_000    # `claude -p` (prompt on stdin) keeps its own context for tools
+_SDK_INLINE_CHARS  = 400_000   # ≈100k tokens in one SDK request
+_MAP_REDUCE_ROUNDS = 3
+_CONDENSE_JOBS     = 4
+
+_CONDENSE_INSTRUCTIONS = """You condense one part of a larger documentation set into dense reference
+notes. The notes of all parts are later combined into a Claude Code skill.
+
+RULES:
+- Output ONLY markdown notes — no preamble, no commentary
+- Keep every API, command, flag, config key, type, error and official URL
+- Keep the most useful code examples verbatim, in fenced blocks with a language tag
+- Drop marketing prose, repetition, navigation text and legal boilerplate
+- Preserve the section structure with ## and ### headings
+- NO XML angle brackets anywhere (outside code fences)"""
+
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+
+
+def _split_markdown_chunks(text: str, max_chars: int) -> list[str]:
+    """Split markdown on headings (outside code fences) into chunks of at most max_chars."""
+    sections: list[str] = []
+    current: list[str] = []
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and _HEADING_RE.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+
+    # Oversized sections fall back to paragraph, then hard splits
+    pieces: list[str] = []
+    for section in sections:
+        if len(section) <= max_chars:
+            pieces.append(section)
+            continue
+        for para in re.split(r"(?<=\n\n)", section):
+            pieces.extend(para[i:i + max_chars] for i in range(0, len(para), max_chars))
+
+    chunks: list[str] = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(piece) <= max_chars:
+            chunks[-1] += piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def _generation_skipped(folder_name: str, reason: str) -> None:
+    """Record a folder whose generation could not finish; the next run generates it again."""
+    with _skipped_lock:
+        _failed_generations.append(f"{folder_name}/ ({reason})")
+    # Forget the source checksum so the next run does not skip the folder
+    (REPO_ROOT / folder_name / "tree.b2sum").unlink(missing_ok=True)
+
+
+def _condense_document(
+    doc_text: str, skill_name: str, budget: int, claude_bin: Optional[str]
+) -> Optional[str]:
+    """
+    Map step: condense doc_text chunk by chunk until it fits in budget
+    characters.  None if a part could not be condensed or the notes still do
+    not fit — documentation is never cut to size.
+    """
+    for round_no in range(1, _MAP_REDUCE_ROUNDS + 1):
+        if len(doc_text) <= budget:
+            break
+        chunks = _split_markdown_chunks(doc_text, _CHUNK_CHARS)
+        # Share 80% of the budget between chunks (~6 chars per word), and
+        # always ask for at least a 2x reduction.
+        target_words = max(200, min(budget * 4 // 5 // len(chunks) // 6, _CHUNK_CHARS // 12))
+        _log(f"    Condensing {len(doc_text):,} chars for {skill_name} "
+              f"({len(chunks)} chunks, round {round_no}) …")
+
+        def condense(indexed: tuple[int, str]) -> str:
+            i, chunk = indexed
+            task = (f"Condense part {i + 1} of {len(chunks)} of the documentation for "
+                    f"'{skill_name}' to at most {target_words} words:\n\n{chunk}")
+            if claude_bin:
+                out = _run_claude_cli(claude_bin, f"{_CONDENSE_INSTRUCTIONS}\n\n{task}",
+                                      label=f"{skill_name} part {i + 1}/{len(chunks)}")
+            else:
+                system = [{"type": "text", "text": _CONDENSE_INSTRUCTIONS,
+                           "cache_control": {"type": "ephemeral"}}]
+                out = _run_sdk(system, task, large=False, max_tokens=8192,
+                               label=f"{skill_name} part {i + 1}/{len(chunks)}")
+            return _strip_code_fence(out) if out else None
+
+        notes = _parallel_map(condense, list(enumerate(chunks)), _CONDENSE_JOBS)
+        failed = [str(i + 1) for i, note in enumerate(notes) if note is None]
+        if failed:
+            _log(f"    WARNING: condensing {skill_name} failed for part(s) "
+                 f"{', '.join(failed)} of {len(chunks)}")
+            return None
+        doc_text = "\n\n---\n\n".join(notes)
+    if len(doc_text) > budget:
+        _log(f"    WARNING: condensed notes for {skill_name} still exceed "
+             f"{budget:,} chars after {_MAP_REDUCE_ROUNDS} rounds")
+        return None
+    return doc_text
+
 
-STRICT FORMAT RULES:
-1. First line must be exactly:  ---
-2. Then:  name: {skill_name}
-3. Then a verbose description field (see DESCRIPTION RULES below)
-4. Then:  ---
-5. Then the Markdown body
+@_traced("generate", lambda doc_text, folder_name, pdf_path=None: folder_name)
+def _generate_skill_via_claude(
+    doc_text: Optional[str],
+    folder_name: str,
+    pdf_path: Optional[Path] = None,
+) -> Optional[dict[str, str]]:
+    """
+    Generate a skill file from documentation.
 
-DESCRIPTION RULES — model the official Anthropic style exactly:
-- Start with "Use this skill whenever the user wants to..."
-- Exhaustively list EVERY task, sub-task, file extension, command, API, concept, and
-  natural-language phrase that should trigger this skill.
-- Include what NOT to use it for if relevant ("Do NOT use for simple X").
-- Aim for 3-6 sentences / 400-900 characters.  No XML angle brackets anywhere.
+    Primary path  — `claude` CLI in batch mode (`-p` flag):
+      Uses the first `claude` found in PATH, which may be a ~/bin wrapper that
+      configures AWS Bedrock credentials.  When pdf_path is supplied the CLI reads
+      the PDF natively via its built-in Read tool — no extraction library needed.
 
-BODY RULES:
-- Sections: ## Setup, ## Quick Start, ## Examples, ## Key Concepts, ## References
-- Every code example must use a fenced block with a language tag (python, bash, go, etc.)
-- NO XML tags anywhere (no angle brackets outside code fences) — security requirement
-- Keep the total file under 5 000 words
-- ## References: link to every official doc URL mentioned in the source material"""
+    Fallback path — Anthropic Python SDK:
+      Used when `claude` is not in PATH (e.g. GitHub Actions).
+      Requires ANTHROPIC_API_KEY and extracted doc_text.
+
+    doc_text longer than the backend's inline budget is condensed first with
+    _condense_document and always produces a multi-file bundle.
+    """
+    skill_name = sanitize_name(folder_name)
 
     # ── primary: claude CLI ────────────────────────────────────────────────────
-    # Skip CLI when running inside an existing Claude Code session (nesting crashes)
-    claude_bin = shutil.which("claude") if not os.environ.get("CLAUDECODE") else None
+    claude_bin = _claude_cli()
     if claude_bin:
+        condensed = False
+        if doc_text is not None and len(doc_text) > _CLI_INLINE_CHARS:
+            doc_text = _condense_document(doc_text, skill_name, _CLI_INLINE_CHARS, claude_bin)
+            if doc_text is None:
+                _generation_skipped(folder_name, "condensing the documentation failed")
+                return None
+            condensed = True
+        large = doc_text is not None and len(doc_text) >= _LARGE_CONTENT_THRESHOLD
+        instructions = (
+            _MULTI_FILE_INSTRUCTIONS if large or condensed else _SINGLE_FILE_INSTRUCTIONS
+        )
         guide_clause = (
             f"First read the skill-building guide at {GUIDE_PDF} "
             f"to understand the required format and rules. "
         ) if GUIDE_PDF.exists() else ""
         if guide_clause:
-            print(f"    Reading {GUIDE_PDF.name} as rules context …")
+            _log(f"    Reading {GUIDE_PDF.name} as rules context …")
         if pdf_path:
             prompt = (
                 f"{guide_clause}"
                 f"Then read the documentation PDF at {pdf_path} and create a "
                 f"Claude Code skill file for it with the name '{skill_name}'.\n\n{instructions}"
             )
-            print(f"    Invoking claude CLI: read guide + read {pdf_path.name} → generate {skill_name}/SKILL.md")
+            _log(f"    Invoking claude CLI: read guide + read {pdf_path.name} → generate {skill_name}/SKILL.md")
         else:
-            doc_excerpt = (doc_text or "")[:14000]
             prompt = (
                 f"{guide_clause}"
                 f"Then create a Claude Code skill file named '{skill_name}' from "
-                f"this documentation:\n\n{doc_excerpt}\n\n{instructions}"
-            )
-            print(f"    Invoking claude CLI: read guide + inline doc → generate {skill_name}/SKILL.md")
-        try:
-            result = subprocess.run(
-                [claude_bin, "-p", prompt, "--output-format", "text"],
-                capture_output=True, text=True, timeout=120,
+                f"this documentation:\n\n{doc_text or ''}\n\n{instructions}"
             )
-            if result.returncode == 0 and result.stdout.strip():
-                return _parse_skill_bundle(result.stdout)
-            print(f"    WARNING: claude CLI non-zero exit: {result.stderr[:200]}")
-        except Exception as exc:
-            print(f"    WARNING: claude CLI error: {exc}")
+            _log(f"    Invoking claude CLI: read guide + inline doc → generate {skill_name}/SKILL.md")
+        raw = _run_claude_cli(claude_bin, prompt, label=skill_name)
+        if raw:
+            return _parse_skill_bundle(raw)
         # fall through to SDK
 
     # ── fallback: Anthropic Python SDK (direct API or Bedrock) ─────────────────
     if not doc_text:
         return None  # nothing to send to the SDK
+    sdk = _sdk_client()
+    if sdk is None:
+        return None
+    _, backend, _ = sdk
 
+    request = _sdk_generation_request(doc_text, skill_name)
+    if request is None:
+        _generation_skipped(folder_name, "condensing the documentation failed")
+        return None
+    system, user_prompt, large, tag = request
+    _log(f"    Invoking {backend} ({tag}→ {skill_name}/SKILL.md)")
+    if not large:
+        raw = _run_sdk(system, user_prompt, large, label=skill_name)
+        return _parse_skill_bundle(raw) if raw else None
+
+    # Large bundles are parsed while they stream: files are checked and
+    # staged in the cache as they complete, and a dropped connection keeps
+    # the ones already finished.
+    staged = CACHE_DIR / _PARTIAL_BUNDLE_DIR / folder_name
+    shutil.rmtree(staged, ignore_errors=True)
+    parser = _BundleParser(progress=skill_name, stage=staged)
     try:
-        import anthropic  # pip install anthropic  (or pip install 'anthropic[bedrock]')
-    except ImportError:
-        print("    WARNING: 'anthropic' package not installed. Run: pip install anthropic")
+        completed = _stream_sdk(system, user_prompt, parser.feed, label=skill_name)
+        bundle = parser.close(truncated=not completed)
+    except _BundleRejected as exc:   # mid-stream, or SKILL.md was the last section
+        _log(f"    WARNING: {skill_name}: {exc}")
+        shutil.rmtree(staged, ignore_errors=True)
         return None
-
-    # Pick the right client: Bedrock when AWS credentials are present, else direct API
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    use_bedrock = not api_key and hasattr(anthropic, "AnthropicBedrock")
-    if not api_key and not use_bedrock:
-        print("    WARNING: ANTHROPIC_API_KEY not set and Bedrock not available.")
+    if completed:
+        shutil.rmtree(staged, ignore_errors=True)
+        return bundle or None
+    if parser.report is None or not parser.report.ok:
+        shutil.rmtree(staged, ignore_errors=True)
         return None
+    # A partial bundle is never installed: its SKILL.md links to files that
+    # never arrived, and the previous install still links to its own.  The
+    # completed files stay staged in the cache for inspection instead.
+    _log(f"    WARNING: {skill_name}: stream ended early — previous install kept, "
+         f"{len(bundle)} completed file(s) staged in {staged}")
+    _generation_skipped(folder_name, f"stream dropped, {len(bundle)} file(s) staged")
+    return None
+
+
+def _sdk_generation_request(
+    doc_text: str, skill_name: str
+) -> Optional[tuple[list[dict], str, bool, str]]:
+    """
+    Build (system blocks, user prompt, large, mode tag) for an SDK skill
+    generation; None if oversized doc_text could not be condensed.
+    """
+    condensed = False
+    if len(doc_text) > _SDK_INLINE_CHARS:
+        condensed_text = _condense_document(doc_text, skill_name, _SDK_INLINE_CHARS, None)
+        if condensed_text is None:
+            return None
+        doc_text, condensed = condensed_text, True
+    large = len(doc_text) >= _LARGE_CONTENT_THRESHOLD
+    instructions = (
+        _MULTI_FILE_INSTRUCTIONS if large or condensed else _SINGLE_FILE_INSTRUCTIONS
+    )
 
     guide = _guide_text()
     if guide:
-        print(f"    Reading {GUIDE_PDF.name} as rules context (text extraction) …")
-    guide_section = f"Skill-building guide (read and follow these rules):\n\n{guide}\n\n" if guide else ""
-    backend = "Bedrock" if use_bedrock else "Anthropic SDK"
+        _log(f"    Reading {GUIDE_PDF.name} as rules context (text extraction) …")
     context_tag = "1M-context " if large else ""
-    multi_tag   = "multi-file " if large else ""
-    print(f"    Invoking {backend} ({context_tag}{multi_tag}→ {skill_name}/SKILL.md)")
-    full_prompt = (
-        f"{guide_section}"
+    multi_tag   = "multi-file " if large or condensed else ""
+    # Stable prefix first (guide, then instructions), each marked as a prompt
+    # cache breakpoint; only the per-skill request varies between calls.
+    system: list[dict] = []
+    if guide:
+        system.append({
+            "type": "text",
+            "text": f"Skill-building guide (read and follow these rules):\n\n{guide}",
+            "cache_control": {"type": "ephemeral"},
+        })
+    system.append({
+        "type": "text", "text": instructions, "cache_control": {"type": "ephemeral"},
+    })
+    source = "condensed notes of the documentation" if condensed else "this documentation"
+    user_prompt = (
         f"Create a Claude Code skill named '{skill_name}' from "
-        f"this documentation:\n\n{doc_text}\n\n{instructions}"
+        f"{source}:\n\n{doc_text}\n\n"
+        f"Follow the output format and rules in the system prompt exactly; "
+        f"the frontmatter must read:  name: {skill_name}"
     )
-    try:
-        if use_bedrock:
-            region = os.environ.get("AWS_DEFAULT_REGION", "us-west-2")
-            profile = os.environ.get("AWS_PROFILE", "bedrock")
-            client = anthropic.AnthropicBedrock(
-                aws_region=region, aws_profile=profile,
-            )
-            if large:
-                model = os.environ.get("BEDROCK_LARGE_MODEL", _LARGE_BEDROCK_MODEL)
-                max_tokens = 65536
-            else:
-                model = os.environ.get("BEDROCK_MODEL",
-                                       "us.anthropic.claude-haiku-4-5-20251001-v1:0")
-                max_tokens = 4096
-        else:
-            client = anthropic.Anthropic(api_key=api_key)
-            if large:
-                model     = os.environ.get("SDK_LARGE_MODEL", _LARGE_SDK_MODEL)
-                max_tokens = 65536
+    return system, user_prompt, large, f"{context_tag}{multi_tag}"
+
+
+# ── Message Batches (--batch) ─────────────────────────────────────────────────
+
+_BATCH_POLL_SECONDS = 30
+_BATCH_MAX_WAIT = 4 * 3600   # default --batch-wait; an unfinished batch is resumed next run
+_BATCH_STATE = "message-batch"   # CACHE_DIR/<name>.json: the submitted, uncollected batch
+
+
+def _batch_custom_id(folder_name: str, doc_text: str) -> str:
+    """Request id derived from the folder and its source text, so a rerun can match it."""
+    return "skill-" + hashlib.sha256(f"{folder_name}\0{doc_text}".encode("utf-8")).hexdigest()[:40]
+
+
+def _generate_batch(
+    sources: list[tuple[str, str]], max_wait: Optional[float] = None,
+) -> Optional[list[Optional[dict[str, str]]]]:
+    """
+    Generate one bundle per (folder_name, doc_text) in a single Message Batches
+    submission.  Returns bundles in input order (None for failed requests), or
+    None when batching is unavailable so the caller can fall back.
+
+    The batch id is kept in CACHE_DIR until its results are read.  A batch
+    that has not ended after max_wait seconds, or whose polling fails, is
+    left running: its folders are recorded as skipped work and the next run
+    resumes it, rather than paying for the same generations again.  A pending
+    batch for other sources is cancelled.
+
+    The client honors ANTHROPIC_BASE_URL, so a local stand-in server works
+    too; benchmarks/fakes/anthropic answers batches fully offline.
+    """
+    sdk = _sdk_client()
+    if sdk is None:
+        return None
+    client, backend, use_bedrock = sdk
+    if use_bedrock or not hasattr(client.messages, "batches"):
+        _log(f"  WARNING: {backend} has no Message Batches API — generating one by one")
+        return None
+
+    custom_ids = [_batch_custom_id(folder_name, doc_text) for folder_name, doc_text in sources]
+    submitted = set(custom_ids)
+    batch = None
+    pending = _load_state(_BATCH_STATE)
+    if pending.get("id"):
+        try:
+            if set(custom_ids) <= set(pending.get("custom_ids", [])):
+                batch = client.messages.batches.retrieve(pending["id"])
+                _log(f"  Resuming message batch {batch.id} ({len(custom_ids)} requests)")
             else:
-                model     = os.environ.get("ANTHROPIC_MODEL", "claude-sonnet-4-6")
-                max_tokens = 4096
-        params = dict(
-            model=model,
-            max_tokens=max_tokens,
-            messages=[{"role": "user", "content": full_prompt}],
-        )
-        if large:
-            # Large requests can exceed 10 min; streaming is required
-            with client.messages.stream(**params) as stream:
-                raw = stream.get_final_text()
-        else:
-            msg = client.messages.create(**params)
-            raw = msg.content[0].text
-        return _parse_skill_bundle(raw)
+                # Sources changed since it was submitted: its results are stale.
+                client.messages.batches.cancel(pending["id"])
+                _log(f"  Cancelled message batch {pending['id']} (sources changed)")
+        except Exception as exc:
+            _log(f"  WARNING: message batch {pending['id']}: {exc}")
+        if batch is None:
+            _save_state(_BATCH_STATE, {})
+
+    if batch is None:
+        requests = []
+        for custom_id, (folder_name, doc_text) in zip(custom_ids, sources):
+            skill_name = sanitize_name(folder_name)
+            request = _sdk_generation_request(doc_text, skill_name)
+            if request is None:
+                _generation_skipped(folder_name, "condensing the documentation failed")
+                continue
+            system, user_prompt, large, _ = request
+            model, max_tokens = _sdk_model(False, large)
+            requests.append({
+                "custom_id": custom_id,
+                "params": {
+                    "model": model,
+                    "max_tokens": max_tokens,
+                    "system": system,
+                    "messages": [{"role": "user", "content": user_prompt}],
+                },
+            })
+        if not requests:
+            return [None] * len(sources)
+        try:
+            batch = client.messages.batches.create(requests=requests)
+        except Exception as exc:   # nothing was submitted, so falling back is free
+            _log(f"  WARNING: message batch failed: {exc}")
+            return None
+        submitted = {r["custom_id"] for r in requests}
+        _save_state(_BATCH_STATE, {"id": batch.id, "custom_ids": sorted(submitted),
+                                   "submitted": int(time.time())})
+        _log(f"  Submitted message batch {batch.id} ({len(requests)} requests)")
+
+    if max_wait is None:
+        max_wait = _BATCH_MAX_WAIT
+    deadline = time.monotonic() + max_wait
+    try:
+        while batch.processing_status != "ended":
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"still {batch.processing_status} after {max_wait:.0f}s")
+            time.sleep(min(_BATCH_POLL_SECONDS, left))
+            batch = client.messages.batches.retrieve(batch.id)
+            c = batch.request_counts
+            _log(f"    batch {batch.id}: {batch.processing_status} — "
+                  f"{c.processing} processing, {c.succeeded} succeeded, "
+                  f"{c.errored} errored, {c.expired} expired")
+        results = {r.custom_id: r.result for r in client.messages.batches.results(batch.id)}
     except Exception as exc:
-        print(f"    WARNING: {backend} error: {exc}")
-        return None
+        _log(f"  WARNING: message batch {batch.id} not collected ({exc}); "
+              f"the next run resumes it")
+        for folder_name, _ in sources:
+            _generation_skipped(folder_name, f"message batch {batch.id} pending")
+        return [None] * len(sources)
+    _save_state(_BATCH_STATE, {})
+
+    bundles: list[Optional[dict[str, str]]] = []
+    for custom_id, (folder_name, _) in zip(custom_ids, sources):
+        if custom_id not in submitted:
+            bundles.append(None)   # condensing failed, already recorded as skipped
+            continue
+        result = results.get(custom_id)
+        if result is None or result.type != "succeeded":
+            kind = result.type if result is not None else "missing"
+            _log(f"    WARNING: batch request for {folder_name} {kind}")
+            bundles.append(None)
+            continue
+        _print_usage(f"batch:{folder_name}", result.message.usage)
+        raw = "".join(b.text for b in result.message.content if getattr(b, "type", "") == "text")
+        _metrics.model_call(sanitize_name(folder_name), f"{backend} batch", None,
+                            result.message.usage, output_chars=len(raw))
+        bundles.append(_parse_skill_bundle(raw))
+    return bundles
 
 
 # ── Source 2: GitHub user repos ────────────────────────────────────────────────
@@ -814,18 +3098,277 @@ BODY RULES:
 THIS_REPO = "claude-skills"   # skip — it is the target repo
 
 
+def _skill_blob_paths(blobs: list[str]) -> list[str]:
+    """Return the blob paths a GitHub scan needs to download, in tree order."""
+    return [
+        p for p in blobs
+        if (p.startswith(".claude/skills/") and p.endswith(".md"))
+        or Path(p).name == "SKILL.md"
+    ]
+
+
+# ── GitHub GraphQL backend (--github-backend graphql) ─────────────────────────
+
+_GRAPHQL_REPOS_PER_QUERY = 10
+_GRAPHQL_BLOBS_PER_QUERY = 50
+_GRAPHQL_TREE_DEPTH = 4   # deeper trees are listed through the REST trees API
+_GRAPHQL_BLOB = "... on Blob { text isTruncated }"
+
+
+def _graphql_tree_selection(depth: int) -> str:
+    """Nested `entries` selection (name, type, oid) for a tree `depth` levels deep."""
+    sel = "name type oid"
+    for _ in range(depth - 1):
+        sel = f"name type oid object {{ ... on Tree {{ entries {{ {sel} }} }} }}"
+    return f"entries {{ {sel} }}"
+
+
+def _graphql_flatten(entries: list, prefix: str = "") -> list[dict]:
+    """Flatten nested GraphQL tree entries into REST trees-API items (path, type, sha)."""
+    items: list[dict] = []
+    for entry in entries or []:
+        path = prefix + entry["name"]
+        items.append({"path": path, "type": entry["type"], "sha": entry["oid"]})
+        sub = (entry.get("object") or {}).get("entries")
+        if sub:
+            items.extend(_graphql_flatten(sub, path + "/"))
+    return items
+
+
+def _graphql_tree_cut(entries: list) -> bool:
+    """True if a subtree sits at the depth limit unexpanded (its contents are unknown)."""
+    for entry in entries or []:
+        if entry["type"] == "tree":
+            sub = (entry.get("object") or {}).get("entries")
+            if sub is None or _graphql_tree_cut(sub):
+                return True
+    return False
+
+
+def _graphql_blob_text(obj: Optional[dict]) -> Optional[str]:
+    if not obj or obj.get("text") is None or obj.get("isTruncated"):
+        return None   # binary or too large for GraphQL — left to the raw fetch
+    return obj["text"]
+
+
+@_traced("graphql", lambda owner, repos: f"{repos[0]['name']} (+{len(repos) - 1} repos)")
+def _graphql_repo_batch(
+    owner: str, repos: list[dict]
+) -> Optional[dict[str, tuple[dict, dict[str, str]]]]:
+    """
+    One GraphQL query for a batch of repos: default-branch tree (to
+    _GRAPHQL_TREE_DEPTH) plus the texts of all `.claude/skills/` files.
+    Returns repo name -> (tree_data shaped like the REST trees API,
+    {path: text}); repos absent from the reply are left to REST.  tree_data
+    has "truncated" set when the depth limit hid part of the tree, as the
+    trees API does for oversized trees.  None if the whole query failed.
+    """
+    tree_sel = _graphql_tree_selection(_GRAPHQL_TREE_DEPTH)
+    fields = [
+        f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo['name'])}) {{"
+        f" defaultBranchRef {{ name target {{ ... on Commit {{ tree {{ oid {tree_sel} }} }} }} }}"
+        f' skills: object(expression: "HEAD:.claude/skills") {{'
+        f" ... on Tree {{ entries {{ name type object {{ {_GRAPHQL_BLOB} }} }} }} }} }}"
+        for i, repo in enumerate(repos)
+    ]
+    data = _github_graphql("query { " + " ".join(fields) + " }")
+    if data is None:
+        return None
+    result: dict[str, tuple[dict, dict[str, str]]] = {}
+    for i, repo in enumerate(repos):
+        node = data.get(f"r{i}") or {}
+        ref = node.get("defaultBranchRef")
+        if not ref or not (ref.get("target") or {}).get("tree"):
+            continue
+        tree = ref["target"]["tree"]
+        texts = {}
+        for entry in (node.get("skills") or {}).get("entries") or []:
+            text = _graphql_blob_text(entry.get("object"))
+            if entry["type"] == "blob" and text is not None:
+                texts[f".claude/skills/{entry['name']}"] = text
+        result[repo["name"]] = (
+            {"sha": tree["oid"], "tree": _graphql_flatten(tree.get("entries")),
+             "truncated": _graphql_tree_cut(tree.get("entries"))},
+            texts,
+        )
+    return result
+
+
+def _graphql_blob_texts(
+    owner: str, blobs: list[tuple[str, str]], jobs: int = 1
+) -> dict[tuple[str, str], str]:
+    """Fetch blob texts by (repo, oid), _GRAPHQL_BLOBS_PER_QUERY per query."""
+    wanted = sorted(set(blobs))
+    chunks = [wanted[i:i + _GRAPHQL_BLOBS_PER_QUERY]
+              for i in range(0, len(wanted), _GRAPHQL_BLOBS_PER_QUERY)]
+
+    def fetch(chunk: list[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        by_repo: dict[str, list[str]] = {}
+        for repo, oid in chunk:
+            by_repo.setdefault(repo, []).append(oid)
+        fields = []
+        for i, (repo, oids) in enumerate(by_repo.items()):
+            objs = " ".join(
+                f"b{j}: object(oid: {json.dumps(oid)}) {{ {_GRAPHQL_BLOB} }}"
+                for j, oid in enumerate(oids)
+            )
+            fields.append(
+                f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {objs} }}"
+            )
+        data = _github_graphql("query { " + " ".join(fields) + " }") or {}
+        texts = {}
+        for i, (repo, oids) in enumerate(by_repo.items()):
+            node = data.get(f"r{i}") or {}
+            for j, oid in enumerate(oids):
+                text = _graphql_blob_text(node.get(f"b{j}"))
+                if text is not None:
+                    texts[(repo, oid)] = text
+        return texts
+
+    found: dict[tuple[str, str], str] = {}
+    for texts in _parallel_map(fetch, chunks, jobs):
+        found.update(texts)
+    return found
+
+
+# ── local git mirrors (--github-backend git) ──────────────────────────────────
+
+_MIRROR_DIR = "mirrors"        # inside CACHE_DIR: <owner>/<repo>.git
+_MIRROR_MAX_AGE = 30 * 86400   # seconds; mirrors not fetched since are deleted
+_GIT_TIMEOUT = 300             # seconds per git command
+
+
+def _mirror_path(owner: str, repo: str) -> Path:
+    return CACHE_DIR / _MIRROR_DIR / owner / f"{repo}.git"
+
+
+def _git(cwd: Path, label: str, *args: str, stdin: Optional[bytes] = None) -> Optional[bytes]:
+    """Run `git -C cwd args…`; stdout, or None (with a warning) if git failed."""
+    # Never prompt for credentials: a renamed or private repo just fails.
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(cwd), *args], input=stdin, capture_output=True,
+            env=env, timeout=_GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        _log(f"  WARNING: {label}: git failed: {e}")
+        return None
+    if result.returncode != 0:
+        err = [line for line in result.stderr.decode("utf-8", errors="replace").splitlines()
+               if line.startswith(("fatal:", "error:"))]
+        _log(f"  WARNING: {label}: {err[0] if err else f'git exited {result.returncode}'}")
+        return None
+    return result.stdout
+
+
+@_traced("mirror", lambda owner, repo: repo["name"])
+def _mirror_repo_tree(owner: str, repo: dict) -> Optional[dict]:
+    """
+    Bring the local mirror of owner/repo up to date and list its
+    default-branch tree, shaped like the REST trees API.  Mirrors are bare,
+    single-branch, blobless partial clones, so a clone or fetch transfers
+    commits and trees only; skill blobs are read later by
+    _mirror_blob_texts().  None if git failed — that repo is left to REST.
+    """
+    name = repo["name"]
+    branch = repo.get("default_branch", "main")
+    ref = f"refs/heads/{branch}"
+    mirror = _mirror_path(owner, name)
+    if (mirror / "HEAD").exists():
+        ok = _git(mirror, name, "fetch", "--quiet", "--no-tags", "--filter=blob:none",
+                  "origin", f"+{ref}:{ref}")
+    else:
+        # Clone next to the mirror and rename, so an interrupted clone is
+        # never mistaken for a mirror by the next run.
+        tmp = mirror.with_name(mirror.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        ok = _git(tmp.parent, name, "clone", "--quiet", "--bare", "--filter=blob:none",
+                  "--single-branch", "--branch", branch, "--no-tags",
+                  f"{GITHUB_CLONE_BASE}/{owner}/{name}.git", tmp.name)
+        if ok is not None:
+            tmp.rename(mirror)
+    if ok is None:
+        return None
+    os.utime(mirror)   # last fetched, for _prune_mirrors()
+    tree_sha = _git(mirror, name, "rev-parse", f"{ref}^{{tree}}")
+    listing = _git(mirror, name, "ls-tree", "-r", "-z", ref)
+    if tree_sha is None or listing is None:
+        return None
+    items = []
+    for entry in listing.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b"\t")
+        _mode, kind, sha = meta.decode("ascii").split()
+        items.append({"path": path.decode("utf-8", errors="replace"), "type": kind, "sha": sha})
+    return {"sha": tree_sha.decode("ascii").strip(), "tree": items}
+
+
+@_traced("mirror", lambda owner, repo, shas: f"{repo} ({len(shas)} blobs)")
+def _mirror_blob_texts(owner: str, repo: str, shas: list[str]) -> dict[str, str]:
+    """Texts of blobs from the mirror of owner/repo, by sha; unreadable ones are left out."""
+    mirror = _mirror_path(owner, repo)
+    wanted = sorted(set(shas))
+    # Blobs a fetch left behind are requested in one round trip (the noop
+    # negotiation skips the commit walk), instead of cat-file faulting each
+    # one in separately.  If the server refuses, cat-file still tries.
+    _git(mirror, repo, "-c", "fetch.negotiationAlgorithm=noop", "fetch", "--quiet",
+         "--no-tags", "--no-write-fetch-head", "--filter=blob:none", "origin", *wanted)
+    out = _git(mirror, repo, "cat-file", "--batch",
+               stdin="".join(f"{sha}\n" for sha in wanted).encode("ascii"))
+    texts: dict[str, str] = {}
+    pos = 0
+    while out is not None and pos < len(out):
+        # "<sha> blob <size>\n<content>\n", or "<sha> missing\n"
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        pos = end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        if header[1] == b"blob":
+            texts[header[0].decode("ascii")] = out[pos:pos + size].decode("utf-8", errors="replace")
+        pos += size + 1
+    return texts
+
+
+def _prune_mirrors(owner: str, verbose: bool) -> None:
+    """Delete mirrors of owner's repos that no run has fetched for _MIRROR_MAX_AGE."""
+    cutoff = time.time() - _MIRROR_MAX_AGE
+    for mirror in (CACHE_DIR / _MIRROR_DIR / owner).glob("*.git"):
+        if mirror.stat().st_mtime < cutoff:
+            shutil.rmtree(mirror, ignore_errors=True)
+            if verbose:
+                _log(f"  Removed stale mirror {mirror.name}")
+
+
+@_traced("phase")
 def collect_github_user(
-    username: str, dry_run: bool, verbose: bool, force: bool
+    username: str, dry_run: bool, verbose: bool, force: bool, jobs: int = 1,
+    backend: str = "rest",
 ) -> None:
-    print(f"\n=== Source 2: GitHub user '{username}' ===")
+    _log(f"\n=== Source 2: GitHub user '{username}' ===")
+
+    cutoff = datetime.now(timezone.utc).timestamp() - 30 * 86400
 
-    # Paginate through all public repos
+    def is_active(repo: dict) -> bool:
+        pushed_at = repo.get("pushed_at") or ""
+        if not pushed_at:
+            return True
+        pushed_ts = datetime.fromisoformat(pushed_at.replace("Z", "+00:00")).timestamp()
+        return pushed_ts >= cutoff
+
+    # Page through public repos, most recently pushed first.  Everything past
+    # the 30-day cutoff would be skipped anyway, so stop at the first page
+    # that reaches beyond it.
     repos: list[dict] = []
     page = 1
     while True:
         url = (
             f"{GITHUB_API_BASE}/users/{username}/repos"
-            f"?per_page=100&page={page}&type=public"
+            f"?per_page=100&page={page}&type=public&sort=pushed&direction=desc"
         )
         batch = _github_get(url)
         if not batch:
@@ -833,47 +3376,266 @@ def collect_github_user(
         repos.extend(batch)
         if len(batch) < 100:
             break
+        if batch[-1].get("pushed_at") and not is_active(batch[-1]):
+            break
         page += 1
 
-    cutoff = datetime.now(timezone.utc).timestamp() - 30 * 86400
-    recent = sum(
-        1 for r in repos
-        if r.get("pushed_at")
-        and datetime.fromisoformat(r["pushed_at"].replace("Z", "+00:00")).timestamp() >= cutoff
+    active = [r for r in repos if r["name"] != THIS_REPO and is_active(r)]
+
+    # Incremental sync state: repo -> {pushed_at, branch, tree_sha, blobs}, where
+    # blobs maps the skill paths of the last-seen tree to their blob shas.  A repo
+    # whose pushed_at and default branch match the stored entry has not moved,
+    # so its tree is rebuilt from the state instead of calling the tree API.
+    # --force keeps using it: an unmoved repo's skill files are still checked
+    # against their installed copies below.
+    sync_state = _load_state("github-sync")
+    seen: dict[str, dict] = sync_state.get(username, {})
+
+    def has_moved(repo: dict) -> bool:
+        prev = seen.get(repo["name"])
+        return (
+            not prev or not repo.get("pushed_at")
+            or prev.get("pushed_at") != repo["pushed_at"]
+            or prev.get("branch") != repo.get("default_branch", "main")
+        )
+
+    moved = [r for r in active if has_moved(r)]
+    recent = sum(1 for r in repos if r.get("pushed_at") and is_active(r))
+    _log(
+        f"  Found {recent} public repos active in the last 30 days, "
+        f"{len(moved)} pushed since the last sync"
     )
-    print(f"  Found {len(repos)} public repos, {recent} active in the last 30 days")
+
+    use_graphql = backend == "graphql"
+    if use_graphql and not _github_token():
+        _log("  WARNING: --github-backend graphql needs GH_TOKEN or GITHUB_TOKEN; using REST")
+        use_graphql = False
+    use_git = backend == "git"
+    if use_git and not shutil.which("git"):
+        _log("  WARNING: --github-backend git needs git in PATH; using REST")
+        use_git = False
+
+    def raw_url(repo_name: str, branch: str, path: str) -> str:
+        return f"{GITHUB_RAW_BASE}/{username}/{repo_name}/{branch}/{path}"
+
+    # Network work runs on a thread pool in two phases (trees, then raw blobs);
+    # installs below stay sequential in repo order so output is deterministic.
+    @_traced("repo-tree", lambda repo: repo["name"])
+    def fetch_tree(repo: dict) -> Optional[dict]:
+        branch = repo.get("default_branch", "main")
+        # Fetch the full file tree (recursive) — one API call per changed repo
+        return _github_get(
+            f"{GITHUB_API_BASE}/repos/{username}/{repo['name']}"
+            f"/git/trees/{branch}?recursive=1"
+        )
+
+    fetched_trees: dict[str, Optional[dict]] = {}
+    prefetched: dict[str, str] = {}   # raw URL -> text already returned by GraphQL
+    if use_graphql:
+        # One query per batch of repos returns tree and .claude/skills texts;
+        # repos (or whole batches) it cannot answer fall through to REST.
+        groups = [moved[i:i + _GRAPHQL_REPOS_PER_QUERY]
+                  for i in range(0, len(moved), _GRAPHQL_REPOS_PER_QUERY)]
+        replies = _parallel_map(lambda g: _graphql_repo_batch(username, g), groups, jobs)
+        for group, reply in zip(groups, replies):
+            for repo in group:
+                if reply and repo["name"] in reply:
+                    tree_data, texts = reply[repo["name"]]
+                    # A tree cut at the depth limit may hide SKILL.md files, and
+                    # the sync state must hold complete trees: the recursive REST
+                    # tree is listed instead.  The skill texts are still used.
+                    if not tree_data["truncated"]:
+                        fetched_trees[repo["name"]] = tree_data
+                    branch = repo.get("default_branch", "main")
+                    for path, text in texts.items():
+                        prefetched[raw_url(repo["name"], branch, path)] = text
+    mirrored: set[str] = set()       # repos whose tree came from a local mirror
+    if use_git:
+        # Clone or fetch a blobless mirror per pushed repo; repos git cannot
+        # reach fall through to REST.
+        mirror_trees = _parallel_map(lambda r: _mirror_repo_tree(username, r), moved, jobs)
+        for repo, tree_data in zip(moved, mirror_trees):
+            if tree_data is not None:
+                fetched_trees[repo["name"]] = tree_data
+                mirrored.add(repo["name"])
+        if verbose and moved:
+            _log(f"  Updated {len(mirrored)} of {len(moved)} local mirror(s)")
+        if not dry_run:
+            _prune_mirrors(username, verbose)
+    rest_repos = [r for r in moved if r["name"] not in fetched_trees]
+    fetched_trees.update(zip(
+        (r["name"] for r in rest_repos), _parallel_map(fetch_tree, rest_repos, jobs)
+    ))
+    trees: list[Optional[dict]] = []
+    for repo in active:
+        if repo["name"] in fetched_trees:
+            tree_data = fetched_trees[repo["name"]]
+            prev_sha = seen.get(repo["name"], {}).get("tree_sha")
+            if verbose and tree_data and prev_sha and tree_data.get("sha") == prev_sha:
+                _log(f"  {repo['name']}: pushed, but the {repo.get('default_branch', 'main')} tree is unchanged")
+        else:
+            prev = seen[repo["name"]]
+            tree_data = {
+                "sha": prev.get("tree_sha"),
+                "tree": [{"path": p, "type": "blob", "sha": sha}
+                         for p, sha in prev.get("blobs", {}).items()],
+            }
+        trees.append(tree_data)
+
+    if repos and not dry_run:
+        # Rebuild from this run's active repos; repos that failed to list
+        # their tree are left out so the next run retries them.
+        sync_state[username] = {
+            repo["name"]: {
+                "pushed_at": repo.get("pushed_at"),
+                "branch": repo.get("default_branch", "main"),
+                "tree_sha": tree_data.get("sha"),
+                "blobs": {
+                    item["path"]: item.get("sha") for item in tree_data["tree"]
+                    if item.get("type") == "blob"
+                    and _skill_blob_paths([item["path"]])
+                },
+            }
+            for repo, tree_data in zip(active, trees)
+            if tree_data and "tree" in tree_data
+        }
+
+    # Blob-SHA manifest: (owner/repo/path) -> {sha, name, target, key, sha256}.
+    # A blob whose git sha is unchanged since the last run, and whose target
+    # still holds what it installed, is neither downloaded, validated nor
+    # installed again; --force has nothing to replace there.
+    blob_manifest = _load_state("github-blobs")
+
+    def blob_key(repo_name: str, path: str) -> str:
+        return f"{username}/{repo_name}/{path}"
+
+    def unchanged(repo_name: str, path: str, sha: Optional[str]) -> Optional[dict]:
+        entry = blob_manifest.get(blob_key(repo_name, path))
+        if not sha or not entry or entry.get("sha") != sha:
+            return None
+        return entry
+
+    def tree_blobs(tree_data: dict) -> dict[str, Optional[str]]:
+        return {item["path"]: item.get("sha")
+                for item in tree_data["tree"] if item.get("type") == "blob"}
+
+    # (url, repo, blob sha) of every changed skill file
+    changed: list[tuple[str, str, Optional[str]]] = []
+    for repo, tree_data in zip(active, trees):
+        if not tree_data or "tree" not in tree_data:
+            continue
+        branch = repo.get("default_branch", "main")
+        shas = tree_blobs(tree_data)
+        changed.extend(
+            (raw_url(repo["name"], branch, path), repo["name"], shas[path])
+            for path in _skill_blob_paths(list(shas))
+            if not unchanged(repo["name"], path, shas[path])
+        )
+    raw_contents: dict[str, Optional[str]] = {
+        url: prefetched[url] for url, _, _ in changed if url in prefetched
+    }
+    # Identical blobs (forks, copied skills) are fetched once: from the skill
+    # store when an earlier run saw them, else through one of their URLs.
+    for url, _, sha in changed:
+        if url not in raw_contents:
+            text = _skill_store.blob_text(sha)
+            if text is not None:
+                raw_contents[url] = text
+    if use_graphql:
+        wanted = {sha: (repo, sha) for url, repo, sha in changed if sha and url not in raw_contents}
+        by_oid = _graphql_blob_texts(username, list(wanted.values()), jobs)
+        by_sha = {sha: text for (_, sha), text in by_oid.items()}
+        for url, _, sha in changed:
+            if url not in raw_contents and sha in by_sha:
+                raw_contents[url] = by_sha[sha]
+    if use_git:
+        # Read the changed blobs out of the mirrors, each sha from one repo.
+        mirror_shas: dict[str, list[str]] = {}
+        assigned: set[str] = set()
+        for url, repo, sha in changed:
+            if sha and url not in raw_contents and repo in mirrored and sha not in assigned:
+                assigned.add(sha)
+                mirror_shas.setdefault(repo, []).append(sha)
+        by_sha = {}
+        for texts in _parallel_map(lambda r: _mirror_blob_texts(username, r, mirror_shas[r]),
+                                   list(mirror_shas), jobs):
+            by_sha.update(texts)
+        for url, _, sha in changed:
+            if url not in raw_contents and sha in by_sha:
+                raw_contents[url] = by_sha[sha]
+    fetch_url: dict[str, str] = {}   # blob sha -> the one URL it is fetched from
+    raw_urls = []
+    for url, _, sha in changed:
+        if url in raw_contents or (sha and sha in fetch_url):
+            continue
+        if sha:
+            fetch_url[sha] = url
+        raw_urls.append(url)
+    raw_contents.update(zip(raw_urls, _parallel_map(_fetch_raw, raw_urls, jobs)))
+    for url, _, sha in changed:
+        if url not in raw_contents:
+            raw_contents[url] = raw_contents[fetch_url[sha]]
+        _skill_store.put_blob(sha, raw_contents[url])
+    if verbose and changed:
+        _log(f"  Downloaded {len(changed)} changed skill file(s)")
+
+    tree_by_repo = {repo["name"]: tree for repo, tree in zip(active, trees)}
 
     for repo in repos:
         repo_name: str = repo["name"]
         if repo_name == THIS_REPO:
             if verbose:
-                print(f"  Skipping {repo_name} (target repo)")
+                _log(f"  Skipping {repo_name} (target repo)")
             continue
-        pushed_at = repo.get("pushed_at") or ""
-        if pushed_at:
-            pushed_ts = datetime.fromisoformat(pushed_at.replace("Z", "+00:00")).timestamp()
-            if pushed_ts < cutoff:
-                if verbose:
-                    print(f"  Skipping {repo_name} (no activity in 30 days)")
-                continue
+        if not is_active(repo):
+            if verbose:
+                _log(f"  Skipping {repo_name} (no activity in 30 days)")
+            continue
+        tree_data = tree_by_repo[repo_name]
         branch: str = repo.get("default_branch", "main")
         if verbose:
-            print(f"  Checking {repo_name} [{branch}] …")
-
-        # Fetch the full file tree (recursive) — one API call per repo
-        tree_url = (
-            f"{GITHUB_API_BASE}/repos/{username}/{repo_name}"
-            f"/git/trees/{branch}?recursive=1"
-        )
-        tree_data = _github_get(tree_url)
+            _log(f"  Checking {repo_name} [{branch}] …")
         if not tree_data or "tree" not in tree_data:
             continue
 
-        blobs: list[str] = [
-            item["path"]
-            for item in tree_data["tree"]
-            if item.get("type") == "blob"
-        ]
+        shas = tree_blobs(tree_data)
+        blobs: list[str] = list(shas)
+
+        def content_for(path: str) -> Optional[str]:
+            url = raw_url(repo_name, branch, path)
+            if url not in raw_contents:   # unchanged blob that now needs a new target
+                raw_contents[url] = _skill_store.blob_text(shas.get(path)) or _fetch_raw(url)
+                _skill_store.put_blob(shas.get(path), raw_contents[url])
+            return raw_contents[url]
+
+        def record(path: str, name: Optional[str], target: Optional[str],
+                   see_also: bool = False, content: Optional[str] = None) -> None:
+            if shas.get(path):
+                blob_manifest[blob_key(repo_name, path)] = {
+                    "sha": shas[path], "name": name, "target": target,
+                }
+                if see_also:
+                    blob_manifest[blob_key(repo_name, path)]["see_also"] = True
+                if content:   # normalized hash of what was installed, for claims,
+                    # and the exact one, to notice later edits to the target
+                    blob_manifest[blob_key(repo_name, path)]["key"] = _normalized_sha256(content)
+                    blob_manifest[blob_key(repo_name, path)]["sha256"] = \
+                        hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+        def claim_unchanged(path: str, entry: dict) -> str:
+            """Claim an untouched target for this run; returns the install status."""
+            if entry.get("key") and _skill_store.claim(
+                    entry["key"], entry["target"], f"github:{username}/{repo_name}/{path}"):
+                return "conflict"
+            return "unchanged"
+
+        def still_installed(entry: dict, target: str) -> bool:
+            """True if target still holds exactly what this blob installed there.
+            A target edited by hand or overwritten from another source goes
+            back through install_skill, which repairs or reports it."""
+            target_dir, _, target_file = target.partition("/")
+            return (entry.get("target") == target and entry.get("sha256") is not None
+                    and _catalog.file_sha256(target_dir, target_file) == entry["sha256"])
 
         repo_key = sanitize_name(repo_name)
         dot_skills_paths = [
@@ -884,104 +3646,159 @@ def collect_github_user(
 
         # 2-a  .claude/skills/*.md — collect first, then group by repo
         if dot_skills_paths:
-            # Fetch all skills from this repo's .claude/skills/
-            fetched: dict[str, tuple[dict, str]] = {}   # stem -> (meta, content)
+            # stem -> (path, meta, content); content is None for unchanged blobs,
+            # whose skill name comes from the manifest instead
+            fetched: dict[str, tuple[str, dict, Optional[str]]] = {}
             for path in dot_skills_paths:
-                raw = f"{GITHUB_RAW_BASE}/{username}/{repo_name}/{branch}/{path}"
-                content = _fetch_raw(raw)
-                if content and is_valid_skill(content):
-                    meta, _ = parse_frontmatter(content)
-                    fetched[Path(path).stem] = (meta, content)
+                entry = unchanged(repo_name, path, shas[path])
+                if entry:
+                    if entry.get("name") is not None:
+                        fetched[Path(path).stem] = (path, {"name": entry["name"]}, None)
+                    continue
+                content = raw_contents.get(raw_url(repo_name, branch, path))
+                report = validate_skill(content) if content else None
+                if report and report.ok:
+                    _print_skill_warnings(report, f"{repo_name}/{path}", verbose)
+                    fetched[Path(path).stem] = (path, report.meta, content)
+                elif content:
+                    record(path, None, None)   # invalid — skip until the blob changes
 
             # Identify the primary skill (name matches the repo)
             primary_stem = next(
-                (s for s, (m, _) in fetched.items()
+                (s for s, (_, m, _) in fetched.items()
                  if sanitize_name(m.get("name") or s) == repo_key),
                 None,
             )
 
-            sub_files_installed: list[str] = []
-
-            for stem, (meta, content) in fetched.items():
+            # Place every file first, so the primary SKILL.md can be written
+            # once with its ## See Also links to the sub-files.
+            targets: dict[str, tuple[str, str]] = {}
+            sub_files: list[str] = []
+            for stem, (path, meta, content) in fetched.items():
                 skill_name = sanitize_name(meta.get("name") or stem)
-                is_primary = (stem == primary_stem)
-                is_generic = skill_name in GENERIC_SKILLS
-
-                if is_primary:
-                    target_dir, target_file = repo_key, "SKILL.md"
-                elif primary_stem and not is_generic:
+                if stem == primary_stem:
+                    targets[stem] = (repo_key, "SKILL.md")
+                elif primary_stem and skill_name not in GENERIC_SKILLS:
                     # Sub-skill: lives inside the primary skill's folder
-                    target_dir  = repo_key
-                    target_file = f"{skill_name}.md"
-                    sub_files_installed.append(target_file)
+                    targets[stem] = (repo_key, f"{skill_name}.md")
+                    sub_files.append(f"{skill_name}.md")
                 else:
                     # Generic / standalone skill — own top-level folder
-                    target_dir, target_file = skill_name, "SKILL.md"
+                    targets[stem] = (skill_name, "SKILL.md")
 
-                st = install_skill(content, target_dir, dry_run, verbose, force, filename=target_file)
-                print(f"  [github:{repo_name}] .claude/skills/{stem}.md -> {target_dir}/{target_file}  [{st}]")
-                installed_paths.add(f".claude/skills/{stem}.md")
+            for stem, (path, meta, content) in fetched.items():
+                target_dir, target_file = targets[stem]
+                target = f"{target_dir}/{target_file}"
+                is_primary = (stem == primary_stem)
 
-            # Link sub-files from the primary SKILL.md
-            if sub_files_installed and not dry_run:
-                _append_see_also(repo_key, sub_files_installed)
+                entry = unchanged(repo_name, path, shas[path])
+                if (entry and still_installed(entry, target)
+                        and not (is_primary and sub_files and not entry.get("see_also"))):
+                    st = claim_unchanged(path, entry)
+                else:
+                    if content is None:
+                        content = content_for(path)
+                    if not content:
+                        continue
+                    replace = force
+                    if is_primary:
+                        linked = _with_see_also(content, sub_files)
+                        # Our own earlier, link-less copy may gain the links
+                        # without --force; a locally edited one may not.
+                        replace = replace or (
+                            linked != content and _catalog.file_sha256(target_dir, target_file)
+                            == hashlib.sha256(content.encode("utf-8")).hexdigest()
+                        )
+                        content = linked
+                    st = install_skill(content, target_dir, dry_run, verbose, replace,
+                                       filename=target_file,
+                                       source=f"github:{username}/{repo_name}/{path}")
+                    if st not in ("skipped", "conflict"):   # keep reporting until resolved
+                        record(path, meta.get("name") or stem, target,
+                               see_also=is_primary and "## See Also" in content, content=content)
+                _log(f"  [github:{repo_name}] .claude/skills/{stem}.md -> {target}  [{st}]")
+                installed_paths.add(f".claude/skills/{stem}.md")
 
         # 2-b  SKILL.md files anywhere in the repo (outside .claude/skills/)
         for path in blobs:
             if Path(path).name == "SKILL.md" and path not in installed_paths:
-                raw = f"{GITHUB_RAW_BASE}/{username}/{repo_name}/{branch}/{path}"
-                content = _fetch_raw(raw)
-                if content and is_valid_skill(content):
-                    meta, _ = parse_frontmatter(content)
+                entry = unchanged(repo_name, path, shas[path])
+                if entry and (entry.get("target") is None or still_installed(entry, entry["target"])):
+                    if entry.get("target"):
+                        st = claim_unchanged(path, entry)
+                        _log(f"  [github:{repo_name}] {path} -> {entry['target']}  [{st}]")
+                    continue
+                content = content_for(path)
+                report = validate_skill(content) if content else None
+                if report and report.ok:
+                    _print_skill_warnings(report, f"{repo_name}/{path}", verbose)
+                    meta = report.meta
                     folder = Path(path).parent.name or repo_name
                     sdir = skill_dirname(meta, folder)
-                    st = install_skill(content, sdir, dry_run, verbose, force)
-                    print(f"  [github:{repo_name}] {path} -> {sdir}/SKILL.md  [{st}]")
+                    st = install_skill(content, sdir, dry_run, verbose, force,
+                                       source=f"github:{username}/{repo_name}/{path}")
+                    _log(f"  [github:{repo_name}] {path} -> {sdir}/SKILL.md  [{st}]")
+                    if st not in ("skipped", "conflict"):
+                        record(path, meta.get("name"), f"{sdir}/SKILL.md", content=content)
+                elif content:
+                    record(path, None, None)
+
+        _sync_skill_dirs()
+
+    if not dry_run:
+        _save_state("github-blobs", blob_manifest)
+        _save_state("github-sync", sync_state)
 
 
 # ── Source 3: skills.txt URLs ──────────────────────────────────────────────────
 
-def collect_from_urls(dry_run: bool, verbose: bool, force: bool) -> None:
-    print("\n=== Source 3: skills.txt URLs ===")
+@_traced("phase")
+def collect_from_urls(dry_run: bool, verbose: bool, force: bool, jobs: int = 1) -> None:
+    _log("\n=== Source 3: skills.txt URLs ===")
     if not SKILLS_TXT.exists():
-        print("  skills.txt not found — skipping")
+        _log("  skills.txt not found — skipping")
         return
 
     lines = SKILLS_TXT.read_text(encoding="utf-8").splitlines()
     urls = [l.strip() for l in lines if l.strip() and not l.lstrip().startswith("#")]
 
-    for url in urls:
-        print(f"  Checking: {url}")
-        raw_skill_url = _resolve_skill_md_url(url)
-        if not raw_skill_url:
+    # Resolve + fetch every URL concurrently (one request per skill), then
+    # validate and install sequentially in skills.txt order.
+    resolved = _parallel_map(_resolve_skill_md, urls, jobs)
+
+    for url, res in zip(urls, resolved):
+        _log(f"  Checking: {url}")
+        if not res:
             if verbose:
-                print(f"    (could not resolve SKILL.md URL for {url})")
+                _log(f"    (could not resolve SKILL.md URL for {url})")
             continue
+        raw_skill_url, content = res
 
         if verbose:
-            print(f"    -> fetching {raw_skill_url}")
-        content = _fetch_raw(raw_skill_url)
+            _log(f"    -> fetched {raw_skill_url}")
 
-        if content and is_valid_skill(content):
-            meta, _ = parse_frontmatter(content)
+        report = validate_skill(content) if content else None
+        if report and report.ok:
+            _print_skill_warnings(report, url, verbose)
+            meta = report.meta
             fallback = Path(urllib.parse.urlparse(url).path).name or "unnamed"
             sdir = skill_dirname(meta, fallback)
-            st = install_skill(content, sdir, dry_run, verbose, force)
-            print(f"  [url] {url} -> {sdir}/SKILL.md  [{st}]")
+            st = install_skill(content, sdir, dry_run, verbose, force, source=f"url:{url}")
+            _log(f"  [url] {url} -> {sdir}/SKILL.md  [{st}]")
         else:
             if verbose:
-                reason = "invalid frontmatter" if content else "not found"
-                print(f"    (SKILL.md {reason} at {raw_skill_url})")
+                reason = f"invalid: {report.reason()}" if report else "not found"
+                _log(f"    (SKILL.md {reason} at {raw_skill_url})")
 
 
-def _resolve_skill_md_url(url: str) -> Optional[str]:
+def _resolve_skill_md_url(url: str) -> list[str]:
     """
-    Given a URL (GitHub tree page or plain https URL), return the raw URL
-    for the SKILL.md file in that directory.
+    Given a URL (GitHub tree page or plain https URL), return the candidate
+    raw URLs for the SKILL.md file in that directory, in preference order.
 
     Handles:
       https://github.com/owner/repo/tree/branch/path/to/folder
-      https://github.com/owner/repo                          (root)
+      https://github.com/owner/repo                          (root: main, master)
       https://github.com/owner/repo/blob/branch/SKILL.md    (direct)
       https://example.com/some/path/                         (append SKILL.md)
     """
@@ -994,7 +3811,7 @@ def _resolve_skill_md_url(url: str) -> Optional[str]:
         owner, repo, branch, path = m.groups()
         path = path.rstrip("/")
         folder = f"{path}/" if path else ""
-        return f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/{folder}SKILL.md"
+        return [f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/{folder}SKILL.md"]
 
     # 2. GitHub blob URL pointing directly at SKILL.md
     m = re.match(
@@ -1003,26 +3820,42 @@ def _resolve_skill_md_url(url: str) -> Optional[str]:
     )
     if m:
         owner, repo, branch, path = m.groups()
-        return f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/{path}"
+        return [f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/{path}"]
 
     # 3. Root of a GitHub repo  →  check main then master
     m = re.match(r"https://github\.com/([^/]+)/([^/]+)/?$", url)
     if m:
         owner, repo = m.groups()
-        for branch in ("main", "master"):
-            raw = f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/SKILL.md"
-            if _fetch_raw(raw) is not None:
-                return raw
-        return None
+        return [f"{GITHUB_RAW_BASE}/{owner}/{repo}/{branch}/SKILL.md"
+                for branch in ("main", "master")]
 
     # 4. raw.githubusercontent.com URL — use as-is or append SKILL.md
     if "raw.githubusercontent.com" in url:
         if url.endswith("SKILL.md"):
-            return url
-        return url.rstrip("/") + "/SKILL.md"
+            return [url]
+        return [url.rstrip("/") + "/SKILL.md"]
 
     # 5. Generic URL — just append SKILL.md
-    return url.rstrip("/") + "/SKILL.md"
+    return [url.rstrip("/") + "/SKILL.md"]
+
+
+@_traced("url", lambda url: url)
+def _resolve_skill_md(url: str) -> Optional[tuple[str, Optional[str]]]:
+    """
+    Resolve url to its SKILL.md and fetch it in the same step.
+
+    Returns (raw_url, content) — content is None if the file was not found —
+    or None when a bare repo URL has SKILL.md on neither main nor master.
+    Multiple candidates (main/master) are probed concurrently.
+    """
+    candidates = _resolve_skill_md_url(url)
+    if len(candidates) == 1:
+        return candidates[0], _fetch_raw(candidates[0])
+    contents = _parallel_map(_fetch_raw, candidates, len(candidates))
+    for raw, content in zip(candidates, contents):
+        if content is not None:
+            return raw, content
+    return None
 
 
 # ── CLI ────────────────────────────────────────────────────────────────────────
@@ -1035,7 +3868,48 @@ class _HelpOnErrorParser(argparse.ArgumentParser):
         sys.exit(2)
 
 
+def search_main(argv: list[str]) -> int:
+    """collect-skills.py search QUERY… — rank installed skills for a query."""
+    parser = _HelpOnErrorParser(
+        prog="collect-skills.py search",
+        description=(
+            "Search the skills installed in .claude/skills/ (BM25 over names, "
+            "descriptions, headings and body text, SKILL.md and sub-files)."
+        ),
+    )
+    parser.add_argument("query", nargs="+", help="Search terms")
+    parser.add_argument(
+        "-n", "--limit", type=int, default=10, metavar="N",
+        help="Number of results to show (default: 10)",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="List files re-indexed before searching",
+    )
+    args = parser.parse_args(argv)
+
+    # Normally a no-op: the collector updates the index after each run, this
+    # only catches skills edited by hand since then.
+    update_search_index(args.verbose)
+    results = search_skills(" ".join(args.query), max(1, args.limit))
+    if not results:
+        _log("No matching skills.")
+        return 1
+    width = max(len(path) for _, path, _ in results)
+    for score, path, title in results:
+        if len(title) > 80:
+            title = title[:79] + "…"
+        _log(f"{score:6.2f}  {path:<{width}}  {title}")
+    return 0
+
+
 def main(argv: Optional[list[str]] = None) -> int:
+    entered = time.perf_counter_ns()
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "search":
+        return search_main(argv[1:])
+
     parser = _HelpOnErrorParser(
         description=__doc__,
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1048,10 +3922,20 @@ def main(argv: Optional[list[str]] = None) -> int:
         "-v", "--verbose", action="store_true",
         help="Extra output",
     )
-    _default_user = _github_owner_from_remote() or "dirkpetersen"
     parser.add_argument(
-        "--github-user", default=_default_user, metavar="NAME",
-        help=f"GitHub username/org to scan (default: {_default_user})",
+        "--github-user", metavar="NAME",
+        help=(
+            "GitHub username/org to scan "
+            f"(default: owner of the git push remote, else {_DEFAULT_GITHUB_USER})"
+        ),
+    )
+    parser.add_argument(
+        "--github-backend", choices=["rest", "graphql", "git"], default="rest",
+        help=(
+            "How to read GitHub repos: 'rest' (trees API + raw downloads), "
+            "'graphql' (one query per batch of repos; needs GH_TOKEN, else REST) or "
+            "'git' (blobless partial-clone mirrors in the cache, updated by git fetch)"
+        ),
     )
     parser.add_argument(
         "--source", nargs="+", choices=["local", "github", "urls"],
@@ -1070,6 +3954,48 @@ def main(argv: Optional[list[str]] = None) -> int:
         "-f", "--force", action="store_true",
         help="Force regeneration: overwrite existing skills and ignore checksums",
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=8, metavar="N",
+        help="Parallel network requests for GitHub and skills.txt (default: 8; 1 = sequential)",
+    )
+    parser.add_argument(
+        "--batch", action="store_true",
+        help=(
+            "Submit all pending local generations as one Message Batches "
+            "request (Anthropic API only; cheaper for bulk --force runs)"
+        ),
+    )
+    parser.add_argument(
+        "--batch-wait", type=float, default=_BATCH_MAX_WAIT, metavar="SECONDS",
+        help=(
+            f"Longest wait for a --batch submission to end (default: {_BATCH_MAX_WAIT}); "
+            "an unfinished batch is resumed by the next run"
+        ),
+    )
+    parser.add_argument(
+        "--gen-jobs", type=int, default=4, metavar="N",
+        help="Local subfolders generated concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--cli-jobs", type=int, default=2, metavar="N",
+        help="Max concurrent 'claude -p' subprocesses (default: 2)",
+    )
+    parser.add_argument(
+        "--sdk-jobs", type=int, default=4, metavar="N",
+        help="Max concurrent Anthropic SDK / Bedrock requests (default: 4)",
+    )
+    parser.add_argument(
+        "--http-pool-size", type=int, default=8, metavar="N",
+        help="Keep-alive connections per host (default: 8)",
+    )
+    parser.add_argument(
+        "--http-timeout", type=float, default=20, metavar="SECONDS",
+        help="Socket timeout for GitHub/raw requests (default: 20)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"Bypass the conditional-request HTTP cache in {CACHE_DIR}",
+    )
     parser.add_argument(
         "--no-agent", action="store_true",
         help=(
@@ -1077,63 +4003,119 @@ def main(argv: Optional[list[str]] = None) -> int:
             "Equivalent to running from inside a Claude Code session."
         ),
     )
+    parser.add_argument(
+        "--metrics-out", type=Path, metavar="FILE",
+        help="Write per-phase/per-item timings, per-host HTTP counts and model usage as JSON",
+    )
+    parser.add_argument(
+        "--trace-out", type=Path, metavar="FILE",
+        help="Write a Chrome trace-event file (chrome://tracing, ui.perfetto.dev)",
+    )
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="Print where the time went: startup steps (module load, arguments, "
+             "remote lookup, backend probe) and each phase",
+    )
     args = parser.parse_args(argv)
 
+    if args.metrics_out or args.trace_out or args.timings:
+        _metrics.enable()
+        _metrics.add("startup", "module load", _STARTUP_NS, entered)
+        _metrics.add("startup", "arguments", entered, time.perf_counter_ns())
+
     # --no-agent: pretend we are inside a Claude Code session so CLI is skipped
     if args.no_agent:
         os.environ["CLAUDECODE"] = "1"
 
+    global _http_cache_enabled, _cli_slots, _sdk_slots
+    _http_cache_enabled = not args.no_cache
+    _cli_slots = threading.BoundedSemaphore(max(1, args.cli_jobs))
+    _sdk_slots = threading.BoundedSemaphore(max(1, args.sdk_jobs))
+    _http_pool.configure(args.http_pool_size, args.http_timeout)
+
     # flag omitted → default None → run all three
     sources = set(args.source) if args.source else {"local", "github", "urls"}
 
-    # claude CLI takes priority; SDK is the GitHub Actions fallback
-    # Skip CLI when running inside an existing Claude Code session
-    in_claude_session = bool(os.environ.get("CLAUDECODE"))
-    claude_bin = shutil.which("claude") if not in_claude_session else None
-    has_sdk = bool(os.environ.get("ANTHROPIC_API_KEY"))
-    # Also check for Bedrock availability (no API key needed)
-    try:
-        import anthropic
-        has_bedrock = hasattr(anthropic, "AnthropicBedrock")
-    except ImportError:
-        has_bedrock = False
-    generate = (bool(claude_bin) or has_sdk or has_bedrock) and not args.no_generate
+    # The generation backend (claude CLI, else SDK / Bedrock) is probed by
+    # _generation_backend() only once a local folder actually needs it.
+    generate = not args.no_generate
 
-    print("Claude Skills Collector")
-    print(f"  repo root : {REPO_ROOT}")
-    print(f"  skills dir: {SKILLS_DIR}")
+    _log("Claude Skills Collector")
+    _log(f"  repo root : {REPO_ROOT}")
+    _log(f"  skills dir: {SKILLS_DIR}")
     if args.dry_run:
-        print("  *** DRY RUN — no files will be written ***")
-    if generate:
-        if claude_bin:
-            print(f"  AI generation: ON  (claude CLI: {claude_bin})")
-        elif has_sdk:
-            print("  AI generation: ON  (Anthropic SDK, ANTHROPIC_API_KEY set)")
-        elif has_bedrock:
-            print("  AI generation: ON  (AWS Bedrock SDK)")
-        else:
-            print("  AI generation: ON")
-    else:
-        if args.no_generate:
-            reason = "--no-generate flag"
-        else:
-            reason = "no 'claude' in PATH and ANTHROPIC_API_KEY not set"
-        print(f"  AI generation: OFF  ({reason})")
+        _log("  *** DRY RUN — no files will be written ***")
+    if not generate:
+        _log("  AI generation: OFF  (--no-generate flag)")
 
-    _migrate_flat_skills(args.dry_run, args.verbose)
+    with _metrics.span("phase", "migrate"):
+        _migrate_flat_skills(args.dry_run, args.verbose)
 
     if "local" in sources:
-        collect_local(args.dry_run, args.verbose, generate, args.force)
+        collect_local(args.dry_run, args.verbose, generate, args.force,
+                      gen_jobs=args.gen_jobs, batch=args.batch, batch_wait=args.batch_wait)
 
     if "github" in sources:
+        with _metrics.span("startup", "github owner"):
+            github_user = (args.github_user or _github_owner_from_remote()
+                           or _DEFAULT_GITHUB_USER)
         collect_github_user(
-            args.github_user, args.dry_run, args.verbose, args.force
+            github_user, args.dry_run, args.verbose, args.force,
+            jobs=args.jobs, backend=args.github_backend,
         )
 
     if "urls" in sources:
-        collect_from_urls(args.dry_run, args.verbose, args.force)
-
-    print("\nDone.")
+        collect_from_urls(args.dry_run, args.verbose, args.force, jobs=args.jobs)
+
+    if _http_stats["requests"]:
+        _log(f"\n  HTTP: {_http_stats['requests']} requests, "
+              f"{_http_stats['not_modified']} served from cache (304), "
+              f"{_http_stats['retries']} retried")
+    if _http_cache_enabled:
+        with _metrics.span("phase", "prune_http_cache"):
+            _prune_http_cache(args.verbose)
+    _http_pool.close()
+    if not args.dry_run:
+        with _metrics.span("phase", "save_catalog"):
+            _sync_skill_dirs()
+            _catalog.save()
+            _skill_store.save()
+        with _metrics.span("phase", "update_search_index"):
+            indexed, removed = update_search_index(args.verbose)
+        if indexed or removed:
+            _log(f"\n  Search index: {indexed} file(s) indexed, {removed} removed")
+    if _skill_store.duplicates or _skill_store.blobs_reused:
+        _log(f"\n  Dedup: {_skill_store.duplicates} duplicate cop"
+              f"{'y' if _skill_store.duplicates == 1 else 'ies'} of installed skills, "
+              f"{_skill_store.blobs_reused} GitHub blob(s) read from the skill store")
+    if _skill_store.conflicts:
+        _log(f"\n  CONFLICTS: {len(_skill_store.conflicts)} target(s) claimed by "
+              f"different content:")
+        for item in _skill_store.conflicts.values():
+            _log(f"  - {item}")
+    if args.metrics_out or args.trace_out:
+        _log()
+        _metrics.write(args.metrics_out, args.trace_out)
+    if args.timings:
+        _log("\n  Timings:")
+        for cat, name, seconds in _metrics.timings():
+            _log(f"    {cat:<8} {name:<22} {seconds * 1000:9.1f} ms")
+        _log(f"    {'total':<31} {(time.perf_counter_ns() - _STARTUP_NS) / 1e6:9.1f} ms")
+
+    for items, heading in (
+        (_skipped_work, "request(s) failed after retries; these results are missing from this run"),
+        (_failed_generations, "folder(s) could not be generated; they are retried on the next run"),
+    ):
+        if items:
+            _log(f"\nERROR: {len(items)} {heading}:")
+            for item in items[:20]:
+                _log(f"  - {item}")
+            if len(items) > 20:
+                _log(f"  … and {len(items) - 20} more")
+    if _skipped_work or _failed_generations:
+        return 1
+
+    _log("\nDone.")
     return 0
 
 
@@ -0,0 +1,90 @@
+"""Large SDK generations, parsed while they stream."""
+
+import importlib.util
+import types
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "collect_skills", Path(__file__).resolve().parent.parent / "collect-skills.py")
+cs = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cs)
+
+H = (
+    "---\nname: demo\ndescription: Use this skill whenever the user works with demo, "
+    "including setup and configuration.\n---\n\n"
+)
+
+
+class _Events:
+    """messages.create(stream=True) of the SDK, replying with text."""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def __iter__(self):
+        usage = types.SimpleNamespace(input_tokens=1)
+        yield types.SimpleNamespace(type="message_start", message=types.SimpleNamespace(usage=usage))
+        for i in range(0, len(self._text), 7):
+            delta = types.SimpleNamespace(type="text_delta", text=self._text[i:i + 7])
+            yield types.SimpleNamespace(type="content_block_delta", delta=delta)
+        yield types.SimpleNamespace(type="message_delta", usage=types.SimpleNamespace(output_tokens=1))
+
+
+def _generate(monkeypatch, tmp_path, reply: str):
+    client = types.SimpleNamespace(messages=types.SimpleNamespace(
+        create=lambda stream=False, **params: _Events(reply)))
+    monkeypatch.delenv("CLAUDECODE", raising=False)
+    monkeypatch.setattr(cs, "_claude_cli", lambda: None)
+    monkeypatch.setattr(cs, "_sdk_client", lambda: (client, "Anthropic API", False))
+    monkeypatch.setattr(cs, "_sdk_generation_request",
+                        lambda doc_text, skill_name: ([], "prompt", True, ""))
+    monkeypatch.setattr(cs, "CACHE_DIR", tmp_path)
+    return cs._generate_skill_via_claude("docs", "demo")
+
+
+@pytest.mark.parametrize("reply", [
+    "<<<FILE: SKILL.md>>>\n" + H + "bad <x>\n",                               # only section
+    "<<<FILE: ref.md>>>\n# Ref\n\n<<<FILE: SKILL.md>>>\n" + H + "bad <x>\n",  # last section
+    H + "bad <x>\n",                                                           # no markers
+], ids=["only-section", "last-section", "no-markers"])
+def test_invalid_skill_at_end_of_stream_is_rejected(monkeypatch, tmp_path, reply: str) -> None:
+    assert _generate(monkeypatch, tmp_path, reply) is None
+
+
+def test_valid_bundle(monkeypatch, tmp_path) -> None:
+    reply = "<<<FILE: SKILL.md>>>\n" + H + "ok\n<<<FILE: ref.md>>>\n# Ref\n"
+    assert _generate(monkeypatch, tmp_path, reply) == {"SKILL.md": H + "ok", "ref.md": "# Ref"}
+
+
+def test_valid_bundle_is_staged_while_streaming(monkeypatch, tmp_path) -> None:
+    seen = []
+    feed = cs._BundleParser.feed
+
+    def spy(parser, text):
+        feed(parser, text)
+        seen.append(sorted(p.name for p in (tmp_path / "partial-bundles" / "demo").glob("*.md")))
+
+    monkeypatch.setattr(cs._BundleParser, "feed", spy)
+    reply = "<<<FILE: SKILL.md>>>\n" + H + "ok\n<<<FILE: ref.md>>>\n# Ref\n"
+    assert _generate(monkeypatch, tmp_path, reply) == {"SKILL.md": H + "ok", "ref.md": "# Ref"}
+    assert ["SKILL.md"] in seen                                  # written before the end
+    assert not (tmp_path / "partial-bundles" / "demo").exists()  # and cleared after
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13, 1000])
+def test_parser_matches_markers_split_across_pieces(size: int) -> None:
+    reply = ("pre <<< not a marker\n<<<FILE: SKILL.md>>>\n" + H + "a <<< b\n"
+             "<<<FILE: ref.md>>>\n# Ref\ncat <<<\"$x\"\n")
+    parser = cs._BundleParser()
+    for i in range(0, len(reply), size):
+        parser.feed(reply[i:i + size])
+    assert parser.close() == cs._parse_skill_bundle(reply) == {
+        "SKILL.md": H + "a <<< b", "ref.md": "# Ref\ncat <<<\"$x\""}
@@ -0,0 +1,41 @@
+"""Angle-bracket rule of validate_skill(): what counts as code."""
+
+import importlib.util
+import re
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "collect_skills", Path(__file__).resolve().parent.parent / "collect-skills.py")
+cs = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cs)
+
+H = (
+    "---\nname: demo\ndescription: Use this skill whenever the user works with demo, "
+    "including setup and configuration.\n---\n\n"
+)
+
+
+def _legacy_ok(content: str) -> bool:
+    """The original two-substitution check the rule must agree with."""
+    stripped = re.sub(r"```.*?```", "", content, flags=re.DOTALL)
+    stripped = re.sub(r"`[^`]+`", "", stripped)
+    return "<" not in stripped and ">" not in stripped
+
+
+@pytest.mark.parametrize("body, valid", [
+    ("```\n<a>\n", False),                 # an unterminated fence is not code
+    ("```\n<a>\n```\n", True),
+    ("a `x\n<y` b\n", True),               # inline code may span lines
+    ("plain <b> text\n", False),
+    ("`a```<x>```b`\n", True),
+])
+def test_angle_brackets_outside_code(body: str, valid: bool) -> None:
+    assert cs.is_valid_skill(H + body) is valid
+    assert _legacy_ok(H + body) is valid
+
+
+def test_bracket_line_numbers() -> None:
+    report = cs.validate_skill(H + "ok\n```\n<in>\n```\n<out>\n")
+    assert [line for _, rule, line, _ in report.violations if rule == "angle-brackets"] == [10]